@@ -48,10 +48,16 @@ class AddEditAPIDialog(QtWidgets.QDialog, FORM_CLASS):
         self.saveAddButton.setText('Testing Connection...')
 
         api_id = str(uuid.uuid4())
+        rate_limit = None
         if self.api is not None:
             api_id = self.api.id
+            rate_limit = self.api.rate_limit
 
-        api = API({'id': api_id, 'href': self.urlEditBox.text()})
+        api = API({
+            'id': api_id,
+            'href': self.urlEditBox.text(),
+            'rate_limit': rate_limit,
+        })
         self.loading_thread = LoadAPIDataThread(
             api,
             on_error=self.on_api_error,
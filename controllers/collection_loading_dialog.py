@@ -4,7 +4,8 @@ import urllib
 from PyQt5 import uic, QtWidgets
 
 from ..utils.config import Config
-from ..utils.logging import error
+from ..utils.logging import debug, error, warning
+from ..utils import network
 from ..utils import ui
 from ..threads.load_collections_thread import LoadCollectionsThread
 
@@ -23,10 +24,15 @@ class CollectionLoadingDialog(QtWidgets.QDialog, FORM_CLASS):
         self.setupUi(self)
         self.setFixedSize(self.size())
 
+        self._failed = False
+
+        config = Config()
         self.loading_thread = LoadCollectionsThread(
-            Config().apis,
+            config.apis,
+            timeout=config.api_load_timeout,
             on_progress=self.on_progress_update,
             on_error=self.on_error,
+            on_collection_error=self.on_collection_error,
             on_finished=self.on_loading_finished)
 
         self.loading_thread.start()
@@ -36,17 +42,34 @@ class CollectionLoadingDialog(QtWidgets.QDialog, FORM_CLASS):
         self.progressBar.setValue(int(progress * 100))
 
     def on_error(self, e, api):
+        self._failed = True
         if type(e) == urllib.error.URLError:
             error(self.iface, f'Failed to load {api.href}; {e.reason}')
         else:
             error(self.iface, f'Failed to load {api.href}; {type(e).__name__}')
 
+    def on_collection_error(self, e, api, collection_id):
+        if type(e) == urllib.error.URLError:
+            reason = e.reason
+        else:
+            reason = type(e).__name__
+        warning(
+            self.iface,
+            f'Failed to load collection {collection_id} from {api.href}; {reason}'
+        )
+
     def on_loading_finished(self, apis):
         config = Config()
         config.apis = apis
-        config.last_update = time.time()
+        # a catalog that failed keeps its previous entry and is loaded
+        # again next time
+        if not self._failed:
+            config.last_update = time.time()
         config.save()
 
+        stats = network.response_cache.stats
+        debug(f'HTTP cache: {stats["hits"]} hits, {stats["misses"]} misses')
+
         self.progressBar.setValue(100)
         self.hooks['on_finished'](apis)
 
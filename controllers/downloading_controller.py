@@ -6,7 +6,9 @@ from PyQt5 import QtCore
 
 from qgis.PyQt.QtWidgets import QProgressBar
 
+from ..utils.config import Config
 from ..utils.logging import error
+from ..utils import network
 from ..threads.download_items_thread import DownloadItemsThread
 
 
@@ -19,9 +21,13 @@ class DownloadController:
         self._progress_message_bar = None
         self._loading_closed = False
 
+        config = Config()
+        network.scheduler.set_limit(config.bandwidth_limit)
+
         self.loading_thread = DownloadItemsThread(
             self.downloads,
             self.download_directory,
+            workers=config.download_workers,
             on_progress=self.on_progress_update,
             on_gdal_error=self.on_gdal_error,
             on_error=self.on_error,
@@ -86,7 +92,7 @@ class DownloadController:
         else:
             self._progress_message_bar.setText(status)
 
-        self._progress.setValue(current_step - 1)
+        self._progress.setValue(current_step)
 
     def on_downloading_finished(self):
         self.iface.messageBar().clearWidgets()
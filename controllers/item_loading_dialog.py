@@ -2,7 +2,11 @@ from PyQt5 import uic, QtWidgets
 import urllib
 
 from ..utils import ui
-from ..utils.logging import error
+from ..utils.config import Config
+from ..utils.paging import PageSizeTuner
+from ..utils.planner import SearchPlanner
+from ..utils.search_cache import search_cache
+from ..utils.logging import error, warning
 from ..threads.load_items_thread import LoadItemsThread
 
 
@@ -20,38 +24,106 @@ class ItemLoadingDialog(QtWidgets.QDialog, FORM_CLASS):
         self.setupUi(self)
         self.setFixedSize(self.size())
 
+        self._item_count = 0
+        self._api_pages = {}
+        self._done = False
+
+        config = Config()
+        search_cache.ttl = config.search_cache_ttl
+
+        self._page_tuners = {}
+        for api_collection in self.data['api_collections']:
+            api = api_collection['api']
+            self._page_tuners[api.id] = PageSizeTuner(
+                config.page_tuning.get(api.id, None),
+                min_size=config.search_min_page_size,
+                max_size=config.search_max_page_size
+            )
+
         self.loading_thread = LoadItemsThread(self.data['api_collections'],
                                               self.data['extent'],
                                               self.data['start_time'],
                                               self.data['end_time'],
                                               self.data['query'],
+                                              self._page_tuners,
+                                              config.search_max_items,
+                                              config.search_max_bytes,
+                                              SearchPlanner(
+                                                  config.search_max_tiles),
+                                              self.data.get('incremental',
+                                                            False),
                                               on_progress=self.on_progress,
+                                              on_items=self.on_items,
+                                              on_api_error=self.on_api_error,
                                               on_error=self.on_error,
                                               on_finished=self.on_finished)
 
         self.loading_thread.start()
 
     def on_progress(self, api, collections, current_page):
-        collection_label = ', '.join([c.title for c in collections])
-        self.loadingLabel.setText('\n'.join((
-            f'Searching {api.title}',
-            f'Collections: [{collection_label}]',
-            f'Page {current_page}...'
-        )))
+        self._api_pages[api.href] = (api, collections, current_page)
+
+        lines = []
+        for api, collections, current_page in self._api_pages.values():
+            collection_label = ', '.join([c.title for c in collections])
+            lines.append(
+                f'Searching {api.title} [{collection_label}] '
+                f'page {current_page}...'
+            )
+        lines.append(f'{self._item_count} items found')
+        self.loadingLabel.setText('\n'.join(lines))
+
+    def on_items(self, api, items):
+        if self._done:
+            return
+
+        self._item_count += len(items)
+        self.hooks['on_items'](items)
+
+    def on_api_error(self, e, api):
+        if type(e) == urllib.error.URLError:
+            warning(self.iface, f'Search failed for {api.title}; {e.reason}')
+        elif type(e) == urllib.error.HTTPError:
+            warning(self.iface,
+                    f'Search failed for {api.title}; [{e.code}] {e.reason}')
+        else:
+            warning(self.iface,
+                    f'Search failed for {api.title}; {type(e).__name__}')
 
     def on_error(self, e):
+        if self._done:
+            return
+
         if type(e) == urllib.error.URLError:
             error(self.iface, f'Network Error: {e.reason}')
         elif type(e) == urllib.error.HTTPError:
             error(self.iface, f'Network Error: [{e.code}] {e.reason}')
         else:
             error(self.iface, f'Network Error: {type(e).__name__}')
+        self._done = True
+        self.save_page_tuning()
         self.hooks['on_error']()
 
     def on_finished(self, items):
+        if self._done:
+            return
+
+        self._done = True
+        self.save_page_tuning()
         self.hooks['on_finished'](items)
 
+    def save_page_tuning(self):
+        config = Config()
+        for api_id, tuner in self._page_tuners.items():
+            config.set_page_tuning(api_id, tuner.state)
+        config.save()
+
     def closeEvent(self, event):
-        if event.spontaneous():
+        if not self._done:
+            # the search is abandoned, either here or from the results;
+            # signals it already queued are ignored
+            self._done = True
             self.loading_thread.terminate()
+
+        if event.spontaneous():
             self.hooks['on_close']()
@@ -136,7 +136,8 @@ class QueryDialog(QtWidgets.QDialog, FORM_CLASS):
         self.hooks['on_search'](self.api_selections,
                                 self.extent_rect,
                                 self.time_period,
-                                self.query_filters)
+                                self.query_filters,
+                                self.incrementalCheckBox.isChecked())
 
     def on_cancel_clicked(self):
         self.hooks['on_close']()
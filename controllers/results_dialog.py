@@ -11,6 +11,8 @@ from qgis.core import (QgsWkbTypes, QgsPointXY, QgsGeometry, QgsReferencedRectan
 from ..utils import ui
 from ..utils import crs
 from ..utils.config import Config
+from ..utils.logging import warning
+from ..threads.hydrate_items_thread import HydrateItemsThread
 from ..threads.load_preview_thread import LoadPreviewThread
 
 
@@ -29,7 +31,10 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
         self.setupUi(self)
 
         self._item_list_model = None
+        self._items = []
         self._selected_item = None
+        self._preview_threads = {}
+        self._hydrate_threads = []
         self._config = Config()
         self._rubberband = self.create_rubberband()
 
@@ -47,14 +52,22 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
 
     def populate_item_list(self):
         self._item_list_model = QtGui.QStandardItemModel(self.list)
+        self._items = []
 
-        for item in self.items:
+        self.add_items(self.data.get('items', []))
+
+        self.list.setModel(self._item_list_model)
+
+    def add_items(self, items):
+        """Append items to the list in the order the search found them,
+        which is chronological for a planned search."""
+        self._items.extend(items)
+
+        for item in items:
             i = QtGui.QStandardItem(item.id)
             i.setCheckable(True)
             self._item_list_model.appendRow(i)
 
-        self.list.setModel(self._item_list_model)
-
     def populate_download_directory(self):
         self.downloadDirectory.setText(self._config.download_directory)
 
@@ -75,7 +88,7 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
 
     @property
     def items(self):
-        return sorted(self.data.get('items', []))
+        return self._items
 
     @property
     def selected_items(self):
@@ -93,10 +106,42 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
     def on_download_clicked(self):
         self.reset_footprint()
 
-        self.hooks['select_downloads'](
-            self.selected_items,
-            self.download_directory
-        )
+        items = self.selected_items
+        if any(item.partial for item in items):
+            # the asset list needs the full items
+            self.downloadButton.setEnabled(False)
+            self.hydrate_items(items, self.on_download_items_hydrated)
+            return
+
+        self.hooks['select_downloads'](items, self.download_directory)
+
+    def on_download_items_hydrated(self, items):
+        self.update_download_enabled()
+
+        items = [item for item in items if not item.partial]
+        if len(items) == 0:
+            return
+
+        self.hooks['select_downloads'](items, self.download_directory)
+
+    def hydrate_items(self, items, on_finished=None):
+        thread = HydrateItemsThread(items,
+                                    on_item=self.on_item_hydrated,
+                                    on_error=self.on_hydrate_error,
+                                    on_finished=on_finished)
+        # keep a reference until the thread has really finished
+        self._hydrate_threads.append(thread)
+        thread.finished.connect(lambda: self._hydrate_threads.remove(thread))
+        thread.start()
+
+    def on_item_hydrated(self, item):
+        if self._selected_item != item:
+            return
+
+        self.populate_item_details(item)
+
+    def on_hydrate_error(self, item, e):
+        warning(self.iface, f'Failed to load {item.id}; {type(e).__name__}')
 
     def on_download_path_clicked(self):
         self.reset_footprint()
@@ -143,6 +188,8 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
 
     def select_item(self, item):
         self._selected_item = item
+        if item.partial:
+            self.hydrate_items([item])
         self.set_preview(item, False)
         self.populate_item_details(item)
         self.draw_footprint(item)
@@ -164,11 +211,19 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
 
         if not os.path.exists(item.thumbnail_path):
             self.imageView.setText('Loading Preview...')
-            self.loading_thread = LoadPreviewThread(
+            if item.thumbnail_path in self._preview_threads:
+                return
+
+            loading_thread = LoadPreviewThread(
                 item,
                 on_image_loaded=self.on_image_loaded
             )
-            self.loading_thread.start()
+            # keep a reference until the thread has really finished
+            path = item.thumbnail_path
+            self._preview_threads[path] = loading_thread
+            loading_thread.finished.connect(
+                lambda: self._preview_threads.pop(path, None))
+            loading_thread.start()
             return
 
         image_profile = QtGui.QImage(item.thumbnail_path)
@@ -1,9 +1,37 @@
 import re
+import socket
+import http.client
+from time import monotonic as timer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.error import URLError
 from urllib.parse import urlparse
+from .capabilities import Capabilities
 from .collection import Collection
 from .link import Link
 from .search_result import SearchResult
 from ..utils import network
+from ..utils.paging import PageSizeTuner
+from ..utils.search_cache import matches
+
+COLLECTION_WORKERS = 4
+STREAM_BATCH_SIZE = 50
+SEARCH_MAX_ITEMS = 5000
+SEARCH_MAX_BYTES = 256 * 1024 * 1024
+
+# what the results list, its sorting and the footprint need; the rest of
+# an item is fetched through its self link when it is opened
+SEARCH_FIELDS = [
+    'id',
+    'type',
+    'bbox',
+    'geometry',
+    'collection',
+    'links',
+    'properties.datetime',
+    'properties.collection',
+    'properties.eo:cloud_cover',
+    'assets.thumbnail',
+]
 
 
 class API:
@@ -14,25 +42,84 @@ class API:
             Collection(self, c) for c in self._json.get('collections', [])
         ]
 
-    def load(self):
-        self._data = network.request(f'{self.href}/stac')
-        self._collections = [
-            self.load_collection(c) for c in self.collection_ids
-        ]
+        if self.rate_limit is not None and self.href is not None:
+            network.throttle.configure(urlparse(self.href).hostname,
+                                       **self.rate_limit)
+
+    def load(self, on_collection_loaded=None, on_collection_error=None,
+             stop=None):
+        """Load the landing page and every collection.
+
+        Once stop, a threading.Event, is set the collections that haven't
+        been requested yet are skipped.
+        """
+        self._data = network.request(f'{self.href}/stac', cache=True)
+        self._json['capabilities'] = Capabilities.detect(self.href,
+                                                         self._data).json
+
+        collection_ids = self.collection_ids
+        collections = [None] * len(collection_ids)
+
+        def load_collection(collection_id):
+            if stop is not None and stop.is_set():
+                return None
+            return self.load_collection(collection_id)
+
+        with ThreadPoolExecutor(max_workers=COLLECTION_WORKERS) as executor:
+            futures = {
+                executor.submit(load_collection, collection_id): i
+                for i, collection_id in enumerate(collection_ids)
+            }
+            for completed, future in enumerate(as_completed(futures)):
+                i = futures[future]
+                try:
+                    collections[i] = future.result()
+                except (URLError, socket.timeout, http.client.HTTPException,
+                        ValueError) as e:
+                    if on_collection_error is not None:
+                        on_collection_error(collection_ids[i], e)
+
+                if on_collection_loaded is not None:
+                    on_collection_loaded(completed + 1, len(collection_ids))
+
+        self._collections = [c for c in collections if c is not None]
 
     def load_collection(self, collection_id):
         return Collection(self,
                           network.request(
-                              f'{self.href}/collections/{collection_id}'))
+                              f'{self.href}/collections/{collection_id}',
+                              cache=True))
 
     def search_items(self, collections=[], bbox=[], start_time=None,
-                     end_time=None, query=None, page=1, next_page=None, limit=50,
-                     on_next_page=None, page_limit=10):
-        if page > page_limit:
-            return []
+                     end_time=None, query=None, limit=None, on_next_page=None,
+                     tuner=None, max_items=SEARCH_MAX_ITEMS,
+                     max_bytes=SEARCH_MAX_BYTES):
+        items = []
+        for page_items in self.search_pages(collections, bbox, start_time,
+                                            end_time, query, limit,
+                                            on_next_page, tuner, max_items,
+                                            max_bytes):
+            items.extend(page_items)
 
-        if on_next_page is not None:
-            on_next_page(self)
+        return items
+
+    def search_pages(self, collections=[], bbox=[], start_time=None,
+                     end_time=None, query=None, limit=None, on_next_page=None,
+                     tuner=None, max_items=SEARCH_MAX_ITEMS,
+                     max_bytes=SEARCH_MAX_BYTES, on_page=None,
+                     on_truncated=None):
+        """Yield batches of search results until the results run out or the
+        item or byte budget is spent.
+
+        Without a fixed limit the page size comes from tuner, which is
+        updated with the timing and size of every page. on_page is called
+        with each SearchResult, its item count and the limit that was sent
+        once the page has been read, before its last batch is yielded.
+        on_truncated is called with the API when the budget ran out before
+        the results did.
+        """
+        if limit is None and tuner is None:
+            tuner = PageSizeTuner()
 
         if end_time is None:
             time = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -45,29 +132,116 @@ class API:
             'collections': [c.id for c in collections],
             'bbox': bbox,
             'time': time,
-            'limit': limit,
         }
 
+        capabilities = self.capabilities
+        local_query = None
         if query is not None:
-            body['query'] = query
+            if capabilities.known and not capabilities.query:
+                # the server would ignore it; apply it to the results
+                local_query = query
+            else:
+                body['query'] = query
 
-        if next_page is not None:
-            body['next'] = next_page
-        else:
-            body['page'] = page
+        if capabilities.fields:
+            include = SEARCH_FIELDS + [f'properties.{name}'
+                                       for name in (query or {})]
+            body['fields'] = {'include': include, 'exclude': []}
 
-        search_result = SearchResult(self,
-                                     network.request(
-                                         f'{self.href}/stac/search',
-                                         data=body))
+        url = f'{self.href}/stac/search'
+        data = dict(body, limit=limit or tuner.size)
+        next_link = None
+        next_page = None
+        page = 1
+        total_items = 0
+        total_bytes = 0
+        while total_items < max_items and total_bytes < max_bytes:
+            if on_next_page is not None:
+                on_next_page(self)
 
-        items = search_result.items
-        if len(items) >= limit:
-            items.extend(self.search_items(collections, bbox, start_time,
-                         end_time, query, page + 1, search_result.next, limit,
-                         on_next_page=on_next_page))
+            if next_link is not None:
+                # the server's cursor carries the position, so every page
+                # costs the same however deep it is
+                url = next_link.href
+                if next_link.method != 'POST':
+                    data = None
+                elif not next_link.merge:
+                    data = next_link.body
+                else:
+                    data = dict(data or body)
+                    data.pop('page', None)
+                    data.update(next_link.body)
+                    if 'limit' not in next_link.body:
+                        data['limit'] = min(limit or tuner.size,
+                                            max_items - total_items)
+            elif next_page is not None:
+                data.pop('page', None)
+                data['next'] = next_page
+                # a next token carries the position, so the size may
+                # change between pages
+                data['limit'] = min(limit or tuner.size,
+                                    max_items - total_items)
+            else:
+                # page numbers are offsets in units of the first page's
+                # size, which therefore has to stay fixed
+                data['page'] = page
 
-        return items
+            started = timer()
+            paused = 0
+            stream = network.request_features(url, data=data)
+            search_result = SearchResult(self, stream=stream,
+                                         partial=capabilities.fields)
+
+            count = 0
+            batch = []
+            try:
+                for item in search_result.items:
+                    count += 1
+                    if local_query is not None \
+                            and not matches(item.properties, local_query):
+                        continue
+                    batch.append(item)
+                    if len(batch) >= STREAM_BATCH_SIZE:
+                        yielded = timer()
+                        yield batch
+                        paused += timer() - yielded
+                        batch = []
+            except (socket.timeout, http.client.IncompleteRead):
+                if tuner is not None:
+                    tuner.failed()
+                raise
+
+            if tuner is not None:
+                tuner.observe(timer() - started - paused, count,
+                              stream.bytes_read)
+
+            if on_page is not None:
+                on_page(search_result, count,
+                        data.get('limit', None) if data else None)
+
+            if len(batch) > 0:
+                yield batch
+
+            total_items += count
+            total_bytes += stream.bytes_read
+
+            next_link = search_result.next_link
+            if next_link is not None:
+                # a short page doesn't mean the end when the server links
+                # to another one, but an empty one does
+                if count == 0:
+                    return
+                continue
+
+            if data is None or count < data.get('limit', 0):
+                return
+
+            page += 1
+            next_page = search_result.next
+
+        # the budget is counted in items read, before any local filtering
+        if on_truncated is not None:
+            on_truncated(self)
 
     def collection_id_from_href(self, href):
         p = re.compile(r'\/collections\/(.*)')
@@ -87,12 +261,18 @@ class API:
             'href': self.href,
             'data': self.data,
             'collections': [c.json for c in self.collections],
+            'rate_limit': self.rate_limit,
+            'capabilities': self._json.get('capabilities', None),
         }
 
     @property
     def id(self):
         return self._json.get('id', None)
 
+    @property
+    def rate_limit(self):
+        return self._json.get('rate_limit', None)
+
     @property
     def title(self):
         return self.data.get('title', self.href)
@@ -140,5 +320,13 @@ class API:
     def collections(self):
         return self._collections
 
+    @property
+    def capabilities(self):
+        capabilities = self._json.get('capabilities', None)
+        if capabilities is None:
+            # stored before capabilities were detected on load
+            return Capabilities.from_landing_page(self.data)
+        return Capabilities(capabilities)
+
     def __lt__(self, other):
         return self.title.lower() < other.title.lower()
@@ -0,0 +1,105 @@
+import re
+import socket
+import time
+from urllib.error import URLError
+from ..utils import network
+
+# patterns for the last part of a conformance class URI (or a 0.x
+# extension name) and the capability each one stands for
+CONFORMANCE_PATTERNS = {
+    'item_search': re.compile(r'^item-search$'),
+    'fields': re.compile(r'^fields$'),
+    'sort': re.compile(r'^sort$'),
+    'query': re.compile(r'^query$'),
+    'filter': re.compile(r'(^|-)filter$|^cql'),
+    'context': re.compile(r'^context$'),
+}
+
+
+class Capabilities:
+    """What an API is known to support, as far as searching goes.
+
+    Built from the conformance classes the API declares, either on its
+    landing page or, failing that, at its /conformance endpoint.
+    """
+
+    def __init__(self, json={}):
+        self._json = json
+
+    @property
+    def json(self):
+        return self._json
+
+    @property
+    def conformance(self):
+        return self._json.get('conformance', [])
+
+    @property
+    def known(self):
+        """Whether the API declared any conformance at all.
+
+        Older APIs declare nothing, which says nothing about what they
+        actually support.
+        """
+        return len(self.conformance) > 0
+
+    @property
+    def checked(self):
+        return self._json.get('checked', None)
+
+    @property
+    def item_search(self):
+        return self._json.get('item_search', False)
+
+    @property
+    def fields(self):
+        return self._json.get('fields', False)
+
+    @property
+    def sort(self):
+        return self._json.get('sort', False)
+
+    @property
+    def query(self):
+        return self._json.get('query', False)
+
+    @property
+    def filter(self):
+        return self._json.get('filter', False)
+
+    @property
+    def context(self):
+        return self._json.get('context', False)
+
+    @classmethod
+    def from_conformance(cls, conformance, checked=None):
+        json = {'conformance': conformance, 'checked': checked}
+        names = [re.split(r'[#/]', uri.rstrip('/'))[-1]
+                 for uri in conformance if isinstance(uri, str)]
+        for capability, pattern in CONFORMANCE_PATTERNS.items():
+            json[capability] = any(pattern.search(name) for name in names)
+        return cls(json)
+
+    @classmethod
+    def from_landing_page(cls, data):
+        return cls.from_conformance(_declared(data))
+
+    @classmethod
+    def detect(cls, href, data):
+        """Read the landing page's conformance, probing /conformance once
+        when the landing page doesn't list it."""
+        conformance = _declared(data)
+        if len(conformance) == 0:
+            try:
+                conformance = network.request(f'{href}/conformance',
+                                              cache=True).get('conformsTo',
+                                                              [])
+            except (URLError, socket.timeout, ValueError, AttributeError):
+                conformance = []
+
+        return cls.from_conformance(conformance, checked=time.time())
+
+
+def _declared(data):
+    return list(data.get('conformsTo', [])) \
+        + list(data.get('stac_extensions', []))
@@ -1,3 +1,5 @@
+import re
+from datetime import datetime
 from .link import Link
 
 
@@ -54,6 +56,28 @@ class Collection:
     def links(self):
         return [Link(l) for l in self._json.get('links', [])]
 
+    def intersects(self, bbox, start_time=None, end_time=None):
+        """Whether the extent can hold items matching a search.
+
+        Missing or unreadable extents are assumed to match anything.
+        """
+        extent = self.extent
+
+        extent_bbox = extent.spatial_bbox
+        if len(bbox) == 4 and extent_bbox is not None \
+                and not _bbox_intersects(bbox, extent_bbox):
+            return False
+
+        start, end = extent.temporal_interval
+        if end is not None and start_time is not None and end < start_time:
+            return False
+        search_end = end_time if end_time is not None else start_time
+        if start is not None and search_end is not None \
+                and start > search_end:
+            return False
+
+        return True
+
     @property
     def bands(self):
         bands = {}
@@ -83,6 +107,39 @@ class Extent:
     def temporal(self):
         return self._json.get('temporal', None)
 
+    @property
+    def spatial_bbox(self):
+        """The overall bbox as [west, south, east, north], or None.
+
+        Understands both the 0.x flat list and the 1.0 bbox object.
+        """
+        bbox = self.spatial
+        if isinstance(bbox, dict):
+            bboxes = bbox.get('bbox', None) or [None]
+            bbox = bboxes[0]
+
+        if not isinstance(bbox, list) or len(bbox) not in (4, 6) \
+                or not all(isinstance(v, (int, float)) for v in bbox):
+            return None
+        if len(bbox) == 6:
+            return [bbox[0], bbox[1], bbox[3], bbox[4]]
+        return bbox
+
+    @property
+    def temporal_interval(self):
+        """(start, end) as naive UTC datetimes, None for an open end.
+
+        Understands both the 0.x list and the 1.0 interval object.
+        """
+        temporal = self.temporal
+        if isinstance(temporal, dict):
+            intervals = temporal.get('interval', None) or [[None, None]]
+            temporal = intervals[0]
+        if not isinstance(temporal, list) or len(temporal) != 2:
+            return None, None
+
+        return _parse_datetime(temporal[0]), _parse_datetime(temporal[1])
+
 
 class Provider:
     def __init__(self, json={}):
@@ -103,3 +160,28 @@ class Provider:
     @property
     def url(self):
         return self._json.get('url', None)
+
+
+def _parse_datetime(value):
+    if not isinstance(value, str):
+        return None
+
+    # drop fractional seconds and the UTC designator, which strptime on
+    # 3.6 can't parse together
+    value = re.sub(r'(\.\d+)?(Z|[+-]00:?00)?$', '', value.strip())
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _bbox_intersects(a, b):
+    west, south, east, north = b
+    if west > east:
+        # crosses the antimeridian
+        return _bbox_intersects(a, [west, south, 180, north]) \
+            or _bbox_intersects(a, [-180, south, east, north])
+
+    return a[0] <= east and west <= a[2] and a[1] <= north and south <= a[3]
@@ -2,14 +2,16 @@ import os
 import subprocess
 import hashlib
 import tempfile
+from ..utils import manifest
 from ..utils import network
 from ..models.link import Link
 
 
 class Item:
-    def __init__(self, api=None, json={}):
+    def __init__(self, api=None, json={}, partial=False):
         self._api = api
         self._json = json
+        self._partial = partial
 
     @property
     def hashed_id(self):
@@ -46,6 +48,30 @@ class Item:
     def links(self):
         return [Link(l) for l in self._json.get('links', [])]
 
+    @property
+    def partial(self):
+        """Whether this only has the fields a search projected."""
+        return self._partial
+
+    @property
+    def self_href(self):
+        for link in self.links:
+            if link.rel == 'self':
+                return link.href
+
+        return f'{self.api.href}/collections/{self.collection_id}' \
+            f'/items/{self.id}'
+
+    def hydrate(self, json=None):
+        """Replace the projected fields with the full item.
+
+        The item is fetched from its self link unless json is given.
+        """
+        if json is None:
+            json = network.request(self.self_href, cache=True)
+        self._json = json
+        self._partial = False
+
     @property
     def assets(self):
         assets = []
@@ -55,13 +81,16 @@ class Item:
         return assets
 
     @property
-    def collection(self):
+    def collection_id(self):
         collection_id = self.properties.get('collection', None)
         if collection_id is None:
             collection_id = self._json.get('collection', None)
+        return collection_id
 
+    @property
+    def collection(self):
         for collection in self.api.collections:
-            if collection.id == collection_id:
+            if collection.id == self.collection_id:
                 return collection
 
         return None
@@ -119,11 +148,12 @@ class Item:
             steps += 1
         return steps
 
-    def download(self, gdal_path, options, download_directory, on_update=None):
+    def download_tasks(self, options, download_directory):
         item_download_directory = os.path.join(download_directory, self.id)
         if not os.path.exists(item_download_directory):
             os.makedirs(item_download_directory)
 
+        tasks = []
         raster_filenames = []
 
         for asset_key in options.get('assets', []):
@@ -135,28 +165,37 @@ class Item:
                     raster_filenames.append(asset.cog)
                     continue
 
-                if on_update is not None:
-                    on_update(f'Downloading {asset.href}')
-
                 temp_filename = os.path.join(
                     item_download_directory,
                     asset.href.split('/')[-1]
                 )
                 if asset.is_raster:
                     raster_filenames.append(temp_filename)
-                network.download(asset.href, temp_filename)
+                tasks.append((asset, temp_filename))
 
-        if options.get('add_to_layers', False):
-            if on_update is not None:
-                on_update(f'Building Virtual Raster...')
+        return tasks, raster_filenames
+
+    def download_asset(self, asset, filename):
+        """Download an asset unless the manifest shows it's already intact.
+
+        Returns whether anything was downloaded.
+        """
+        if manifest.intact(filename, asset.checksum, asset.size):
+            return False
 
-            arguments = [
-                os.path.join(gdal_path, 'gdalbuildvrt'),
-                '-separate',
-                os.path.join(download_directory, f'{self.id}.vrt')
-            ]
-            arguments.extend(raster_filenames)
-            subprocess.run(arguments)
+        checksum = network.download(asset.href, filename,
+                                    checksum=asset.checksum, size=asset.size)
+        manifest.record(filename, asset.href, checksum)
+        return True
+
+    def build_vrt(self, gdal_path, raster_filenames, download_directory):
+        arguments = [
+            os.path.join(gdal_path, 'gdalbuildvrt'),
+            '-separate',
+            os.path.join(download_directory, f'{self.id}.vrt')
+        ]
+        arguments.extend(raster_filenames)
+        subprocess.run(arguments)
 
     def __lt__(self, other):
         return self.id < other.id
@@ -191,6 +230,14 @@ class Asset:
     def title(self):
         return self._json.get('title', None)
 
+    @property
+    def checksum(self):
+        return self._json.get('file:checksum', None)
+
+    @property
+    def size(self):
+        return self._json.get('file:size', None)
+
     @property
     def pretty_title(self):
         if self.title is not None:
@@ -17,3 +17,15 @@ class Link:
     @property
     def title(self):
         return self._json.get('title', None)
+
+    @property
+    def method(self):
+        return self._json.get('method', 'GET').upper()
+
+    @property
+    def body(self):
+        return self._json.get('body', {})
+
+    @property
+    def merge(self):
+        return self._json.get('merge', False)
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from .collection import _parse_datetime
+from .item import Item
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+# catalogs often publish items some time after their datetime; a re-run
+# searches this far back from the watermark to pick those up
+WATERMARK_OVERLAP = timedelta(days=7)
+
+
+class SavedSearch:
+    """The stored result set of a search with its datetime watermarks.
+
+    watermarks maps each collection id to the latest item datetime seen,
+    so re-running the search only has to ask for what came after it.
+    """
+
+    def __init__(self, json={}):
+        self._json = json
+
+    @property
+    def json(self):
+        return self._json
+
+    @property
+    def end_time(self):
+        return _parse_datetime(self._json.get('end_time', None))
+
+    @property
+    def watermarks(self):
+        return self._json.get('watermarks', {})
+
+    @property
+    def features(self):
+        return self._json.get('features', [])
+
+    @property
+    def partial(self):
+        return self._json.get('partial', False)
+
+    def items(self, api):
+        return [Item(api, f, self.partial) for f in self.features]
+
+    def delta_start(self, collections, start_time, overlap=WATERMARK_OVERLAP):
+        """Where a re-run has to start searching for collections.
+
+        The search starts overlap before the oldest watermark so items
+        published late, or sharing the watermark's datetime, aren't lost;
+        merge() drops the ones already stored. Items published more than
+        overlap after their datetime are still missed.
+        """
+        watermarks = []
+        for collection in collections:
+            watermark = _parse_datetime(self.watermarks.get(collection.id))
+            if watermark is None:
+                return start_time
+            watermarks.append(watermark)
+
+        if len(watermarks) == 0:
+            return start_time
+        return max(start_time, min(watermarks) - overlap)
+
+    def merge(self, collections, items, end_time):
+        """Add the items that aren't stored yet and return them.
+
+        Collections that have no items yet are marked as searched up to
+        end_time. No watermark is ever set later than now, as nothing
+        can have been published for a time that hasn't come yet.
+        """
+        now = datetime.utcnow()
+        features = self.features
+        stored = {(item.collection_id, item.id)
+                  for item in (Item(json=f) for f in features)}
+
+        watermarks = dict(self.watermarks)
+        added = []
+        for item in items:
+            key = (item.collection_id, item.id)
+            if key in stored:
+                continue
+            stored.add(key)
+            added.append(item)
+            features.append(item._json)
+
+            item_time = _parse_datetime(item.properties.get('datetime', None))
+            if item_time is not None:
+                item_time = min(item_time, now)
+            watermark = _parse_datetime(watermarks.get(item.collection_id))
+            if item_time is not None \
+                    and (watermark is None or item_time > watermark):
+                watermarks[item.collection_id] = item_time.strftime(
+                    TIME_FORMAT)
+
+        with_items = {collection_id for collection_id, _ in stored}
+        for collection in collections:
+            if collection.id not in with_items:
+                watermarks[collection.id] = min(end_time, now).strftime(
+                    TIME_FORMAT)
+
+        self._json['features'] = features
+        self._json['watermarks'] = watermarks
+        self._json['end_time'] = end_time.strftime(TIME_FORMAT)
+        return added
+
+    @classmethod
+    def create(cls, collections, items, end_time, partial=False):
+        saved_search = cls({
+            'watermarks': {},
+            'features': [],
+            'partial': partial,
+        })
+        saved_search.merge(collections, items, end_time)
+        return saved_search
@@ -3,9 +3,19 @@ from .link import Link
 
 
 class SearchResult:
-    def __init__(self, api=None, json={}):
+    def __init__(self, api=None, json={}, stream=None, partial=False):
         self._api = api
         self._json = json
+        self._stream = stream
+        self._partial = partial
+
+    @property
+    def json(self):
+        # a streamed result only has its other members once the features
+        # have been read
+        if self._stream is not None:
+            return self._stream.envelope
+        return self._json
 
     @property
     def api(self):
@@ -13,23 +23,50 @@ class SearchResult:
 
     @property
     def type(self):
-        return self._json.get('type', None)
+        return self.json.get('type', None)
 
     @property
     def meta(self):
-        return self._json.get('meta', None)
+        return self.json.get('meta', None)
 
     @property
     def next(self):
-        if self._json.get('search:metadata', None) is None:
+        if self.json.get('search:metadata', None) is None:
             return None
 
-        return self._json.get('search:metadata', {}).get('next', None)
+        return self.json.get('search:metadata', {}).get('next', None)
+
+    @property
+    def matched(self):
+        """The total number of matches, if the server reported it."""
+        json = self.json
+        if json.get('numberMatched', None) is not None:
+            return json['numberMatched']
+
+        for key, member in (('context', 'matched'),
+                            ('search:metadata', 'matched'),
+                            ('meta', 'found')):
+            value = (json.get(key, None) or {}).get(member, None)
+            if value is not None:
+                return value
+
+        return None
+
+    @property
+    def next_link(self):
+        for link in self.links:
+            if link.rel == 'next' and link.href is not None:
+                return link
+
+        return None
 
     @property
     def items(self):
-        return [Item(self.api, f) for f in self._json.get('features', [])]
+        if self._stream is not None:
+            return (Item(self.api, f, self._partial) for f in self._stream)
+        return [Item(self.api, f, self._partial)
+                for f in self._json.get('features', [])]
 
     @property
     def links(self):
-        return [Link(l) for l in self._json.get('links', [])]
+        return [Link(l) for l in self.json.get('links', [])]
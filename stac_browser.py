@@ -15,7 +15,7 @@ from .controllers.download_selection_dialog import DownloadSelectionDialog
 from .controllers.configure_apis_dialog import ConfigureAPIDialog
 from .controllers.about_dialog import AboutDialog
 from .utils.config import Config
-from .utils.logging import error
+from .utils.logging import debug, error, info
 from .utils import crs
 
 
@@ -53,6 +53,7 @@ class STACBrowser:
                 'class': ItemLoadingDialog,
                 'hooks': {
                     'on_close': self.on_close,
+                    'on_items': self.items_loaded,
                     'on_finished': self.item_load_finished,
                     'on_error': self.results_error
                 },
@@ -72,7 +73,8 @@ class STACBrowser:
             },
         }
 
-    def on_search(self, api_collections, extent_rect, time_period, query):
+    def on_search(self, api_collections, extent_rect, time_period, query,
+                  incremental=False):
         (start_time, end_time) = time_period
 
         # the API consumes only EPSG:4326
@@ -85,21 +87,56 @@ class STACBrowser:
             extent_rect.yMaximum()
         ]
 
+        api_collections = self.prune_collections(api_collections, extent,
+                                                 start_time, end_time)
+        if len(api_collections) == 0:
+            info(self.iface, 'No selected collection covers this extent '
+                             'and time period')
+            return
+
         self.windows['ITEM_LOADING']['data'] = {
             'api_collections': api_collections,
             'extent': extent,
             'start_time': start_time,
             'end_time': end_time,
             'query': query,
+            'incremental': incremental,
         }
         self.current_window = 'ITEM_LOADING'
         self.windows['QUERY']['dialog'].close()
         self.load_window()
 
+    def prune_collections(self, api_collections, extent, start_time,
+                          end_time):
+        """Drop the collections, and APIs left without any, whose extent
+        can't overlap the search."""
+        pruned = []
+        for api_collection in api_collections:
+            collections = api_collection['collections']
+            if len(collections) == 0:
+                # the API is searched as a whole
+                pruned.append(api_collection)
+                continue
+
+            collections = [
+                c for c in collections
+                if c.intersects(extent, start_time, end_time)
+            ]
+            skipped = len(api_collection['collections']) - len(collections)
+            if skipped > 0:
+                debug(f'Skipping {skipped} collections of '
+                      f'{api_collection["api"].title} outside the search')
+            if len(collections) > 0:
+                pruned.append(dict(api_collection, collections=collections))
+
+        return pruned
+
     def on_back(self):
         self.windows['RESULTS']['data'] = None
         self.windows['RESULTS']['dialog'].close()
         self.windows['RESULTS']['dialog'] = None
+        # going back stops a search that is still running
+        self.close_item_loading()
 
         self.current_window = 'QUERY'
         self.load_window()
@@ -132,19 +169,40 @@ class STACBrowser:
         self.load_window()
 
     def results_error(self):
-        self.windows['ITEM_LOADING']['dialog'].close()
-        self.windows['ITEM_LOADING']['dialog'] = None
-        self.windows['ITEM_LOADING']['data'] = None
+        self.close_item_loading()
+        if self.windows['RESULTS']['dialog'] is not None:
+            self.windows['RESULTS']['dialog'].close()
+            self.windows['RESULTS']['dialog'] = None
+        self.windows['RESULTS']['data'] = None
         self.current_window = 'QUERY'
         self.load_window()
 
+    def items_loaded(self, items):
+        if len(items) == 0:
+            return
+
+        # the results open with the first items and fill up while the
+        # search goes on
+        if self.windows['RESULTS']['dialog'] is None:
+            self.windows['RESULTS']['data'] = {'items': []}
+            self.current_window = 'RESULTS'
+            self.load_window()
+            self.windows['ITEM_LOADING']['dialog'].raise_()
+
+        self.windows['RESULTS']['dialog'].add_items(items)
+
     def item_load_finished(self, items):
-        self.windows['RESULTS']['data'] = {'items': items}
+        if self.windows['RESULTS']['dialog'] is None:
+            self.windows['RESULTS']['data'] = {'items': items}
         self.current_window = 'RESULTS'
-        self.windows['ITEM_LOADING']['dialog'].close()
+        self.close_item_loading()
+        self.load_window()
+
+    def close_item_loading(self):
+        if self.windows['ITEM_LOADING']['dialog'] is not None:
+            self.windows['ITEM_LOADING']['dialog'].close()
         self.windows['ITEM_LOADING']['data'] = None
         self.windows['ITEM_LOADING']['dialog'] = None
-        self.load_window()
 
     def select_downloads(self, items, download_directory):
         dialog = DownloadSelectionDialog(
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from ..utils import checksum
+
+CONTENT = b'hello world'
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+MD5 = hashlib.md5(CONTENT).hexdigest()
+
+
+class ParseTest(unittest.TestCase):
+    def test_sha256(self):
+        self.assertEqual(checksum.parse(f'1220{SHA256}'),
+                         ('sha256', bytes.fromhex(SHA256)))
+
+    def test_two_byte_function_code(self):
+        # md5 is 0xd5, which takes two varint bytes
+        self.assertEqual(checksum.parse(f'd50110{MD5}'),
+                         ('md5', bytes.fromhex(MD5)))
+
+    def test_upper_case_hex(self):
+        self.assertEqual(checksum.algorithm(f'1220{SHA256}'.upper()),
+                         'sha256')
+
+    def test_invalid(self):
+        for value in (None, '', 'zz', '12', f'1221{SHA256}',
+                      f'1220{SHA256}00', f'1220{SHA256[:-2]}',
+                      f'9999{SHA256}', f'{SHA256}'):
+            self.assertIsNone(checksum.parse(value), value)
+
+    def test_unterminated_varint(self):
+        self.assertIsNone(checksum.parse('ff'))
+        self.assertIsNone(checksum.parse('12ff'))
+
+
+class MultihashTest(unittest.TestCase):
+    def test_round_trip(self):
+        for name in ('sha1', 'sha256', 'sha512', 'md5'):
+            hasher = hashlib.new(name, CONTENT)
+            encoded = checksum.multihash(hasher)
+            self.assertEqual(checksum.parse(encoded),
+                             (name, hasher.digest()))
+
+    def test_sha256(self):
+        hasher = checksum.new()
+        hasher.update(CONTENT)
+        self.assertEqual(checksum.multihash(hasher), f'1220{SHA256}')
+
+    def test_varint(self):
+        for value in (0, 1, 0x7f, 0x80, 0xd5, 300, 2 ** 32):
+            encoded = checksum._encode_varint(value)
+            self.assertEqual(checksum._varint(encoded, 0),
+                             (value, len(encoded)))
+        self.assertEqual(checksum._encode_varint(300), b'\xac\x02')
+
+
+class FileHasherTest(unittest.TestCase):
+    def test_hashes_in_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'file')
+            with open(path, 'wb') as f:
+                f.write(CONTENT)
+
+            hasher = checksum.file_hasher(path, 'sha256', chunk_size=3)
+            self.assertEqual(hasher.hexdigest(), SHA256)
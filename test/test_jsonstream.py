@@ -0,0 +1,128 @@
+import json
+import unittest
+
+from ..utils.jsonstream import FeatureCollectionParser, FeatureStream
+
+DOCUMENT = json.dumps({
+    'type': 'FeatureCollection',
+    'context': {'returned': 3, 'matched': 12},
+    'features': [
+        {'id': 'a', 'properties': {'title': 'quote " and \\ backslash'}},
+        {'id': 'b', 'properties': {'title': 'café ☃',
+                                   'eo:cloud_cover': 12.5,
+                                   'flags': [True, False, None]}},
+        {'id': 'c', 'bbox': [-180, -90.0, 180, 90.0], 'properties': {}},
+    ],
+    'links': [{'rel': 'next', 'href': 'https://example.com/?page=2'}],
+    'numberMatched': 12,
+}, ensure_ascii=False)
+
+
+def parse(*chunks):
+    parser = FeatureCollectionParser()
+    features = []
+    for chunk in chunks:
+        features.extend(parser.feed(chunk))
+    features.extend(parser.close())
+    return features, parser.envelope
+
+
+class FakeResponse:
+    def __init__(self, data, chunk_size):
+        self._chunks = [data[i:i + chunk_size]
+                        for i in range(0, len(data), chunk_size)]
+        self.closed = False
+
+    def read(self, amt=None):
+        if len(self._chunks) == 0:
+            return b''
+        return self._chunks.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+class FeatureCollectionParserTest(unittest.TestCase):
+    def test_whole_document(self):
+        features, envelope = parse(DOCUMENT)
+
+        expected = json.loads(DOCUMENT)
+        self.assertEqual(features, expected['features'])
+        self.assertEqual(envelope['context'], expected['context'])
+        self.assertEqual(envelope['links'], expected['links'])
+        self.assertEqual(envelope['numberMatched'], 12)
+
+    def test_every_split_point(self):
+        expected = parse(DOCUMENT)
+        for i in range(len(DOCUMENT) + 1):
+            self.assertEqual(parse(DOCUMENT[:i], DOCUMENT[i:]), expected,
+                             f'split at {i}')
+
+    def test_one_character_at_a_time(self):
+        self.assertEqual(parse(*DOCUMENT), parse(DOCUMENT))
+
+    def test_split_escapes(self):
+        document = '{"features": [{"id": "\\"\\\\\\u00e9"}]}'
+        expected = json.loads(document)['features']
+        for i in range(len(document) + 1):
+            features, _ = parse(document[:i], document[i:])
+            self.assertEqual(features, expected, f'split at {i}')
+
+    def test_features_are_returned_as_soon_as_complete(self):
+        parser = FeatureCollectionParser()
+        self.assertEqual(parser.feed('{"features": [{"id": "a"}, {"id"'),
+                         [{'id': 'a'}])
+        self.assertEqual(parser.feed(': "b"}]}'), [{'id': 'b'}])
+        self.assertEqual(parser.close(), [])
+
+    def test_literal_split_at_chunk_end(self):
+        _, envelope = parse('{"numberMatched": 1', '2, "features": []}')
+        self.assertEqual(envelope['numberMatched'], 12)
+
+        _, envelope = parse('{"numberMatched": 12', '}')
+        self.assertEqual(envelope['numberMatched'], 12)
+
+    def test_null_features_are_skipped(self):
+        features, _ = parse('{"features": [null, {"id": "a"}, null]}')
+        self.assertEqual(features, [{'id': 'a'}])
+
+    def test_null_features_member(self):
+        features, envelope = parse('{"features": null, "numberMatched": 0}')
+        self.assertEqual(features, [])
+        self.assertIsNone(envelope['features'])
+        self.assertEqual(envelope['numberMatched'], 0)
+
+    def test_empty_document(self):
+        self.assertEqual(parse('{}'), ([], {}))
+        self.assertEqual(parse(' { "features" : [ ] } '),
+                         ([], {'features': []}))
+
+    def test_not_json(self):
+        with self.assertRaises(ValueError):
+            parse('<html><body>Bad Gateway</body></html>')
+
+    def test_truncated_document(self):
+        with self.assertRaises(ValueError):
+            parse('{"features": [{"id": "a"}')
+
+    def test_data_after_document(self):
+        with self.assertRaises(ValueError):
+            parse('{"features": []} {}')
+
+
+class FeatureStreamTest(unittest.TestCase):
+    def test_multibyte_characters_split_between_reads(self):
+        data = DOCUMENT.encode('utf-8')
+        response = FakeResponse(data, 7)
+        stream = FeatureStream(response)
+
+        self.assertEqual(list(stream), json.loads(DOCUMENT)['features'])
+        self.assertEqual(stream.bytes_read, len(data))
+        self.assertEqual(stream.envelope['numberMatched'], 12)
+        self.assertTrue(response.closed)
+
+    def test_closes_response_on_error(self):
+        response = FakeResponse(b'{"features": [', 64)
+        with self.assertRaises(ValueError):
+            list(FeatureStream(response))
+        self.assertTrue(response.closed)
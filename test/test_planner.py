@@ -0,0 +1,283 @@
+import datetime
+import time
+import unittest
+
+from ..utils.planner import (SearchPlanner, search_interval, split_bbox,
+                             split_interval)
+
+
+START = datetime.datetime(2020, 1, 1)
+END = datetime.datetime(2020, 1, 31)
+
+
+class Extent:
+    def __init__(self, start, end):
+        self.temporal_interval = (start, end)
+
+
+class Collection:
+    def __init__(self, id, start=None, end=None):
+        self.id = id
+        self.extent = Extent(start, end)
+
+
+class SearchResult:
+    def __init__(self, matched=None, next=None, next_link=None):
+        self.matched = matched
+        self.next = next
+        self.next_link = next_link
+
+
+class Item:
+    def __init__(self, id):
+        self.id = id
+        self.collection_id = 'c'
+
+
+class API:
+    """Answers every search with a few items of its own plus one that
+    every search finds."""
+
+    id = 'api'
+
+    def __init__(self, matched):
+        self.matched = matched
+        self.searches = []
+
+    def search_pages(self, collections, bbox, start_time, end_time, query,
+                     on_next_page=None, tuner=None, on_page=None, **budget):
+        self.searches.append((bbox, start_time, end_time))
+        n = len(self.searches)
+        items = [Item('shared'), Item(f'{n}-a'), Item(f'{n}-b')]
+        if on_page is not None:
+            on_page(SearchResult(self.matched), len(items), 3)
+        yield items
+
+
+class TruncatedAPI(API):
+    """Runs out of budget in every search of a cell."""
+
+    def search_pages(self, collections, bbox, start_time, end_time, query,
+                     on_next_page=None, tuner=None, on_page=None,
+                     on_truncated=None, **budget):
+        yield from API.search_pages(self, collections, bbox, start_time,
+                                    end_time, query, on_page=on_page)
+        if on_page is None and on_truncated is not None:
+            on_truncated(self)
+
+
+class SlowAPI(API):
+    """Answers searches of earlier time windows later."""
+
+    def search_pages(self, collections, bbox, start_time, end_time, query,
+                     on_next_page=None, tuner=None, on_page=None, **budget):
+        if on_page is not None:
+            yield from API.search_pages(self, collections, bbox, start_time,
+                                        end_time, query, on_page=on_page)
+            return
+        time.sleep((END - start_time).days / 500)
+        yield [Item(start_time.isoformat())]
+
+
+def area(bbox):
+    west, south, east, north = bbox
+    width = east - west if east >= west else east - west + 360
+    return width * (north - south)
+
+
+class SplitBboxTest(unittest.TestCase):
+    def test_square(self):
+        tiles = split_bbox([0, 0, 4, 4], 16)
+        self.assertEqual(len(tiles), 16)
+        self.assertIn([0, 0, 1, 1], tiles)
+        self.assertIn([3, 3, 4, 4], tiles)
+        self.assertAlmostEqual(sum(area(t) for t in tiles), 16)
+
+    def test_never_more_than_tiles(self):
+        for bbox in ([0, 0, 10, 0.001], [0, 0, 20, 1], [0, 0, 1, 20],
+                     [-180, -90, 180, 90], [0, 0, 3, 2]):
+            for count in range(1, 20):
+                tiles = split_bbox(bbox, count)
+                self.assertLessEqual(len(tiles), count, (bbox, count))
+                self.assertGreaterEqual(len(tiles), 1)
+                self.assertAlmostEqual(sum(area(t) for t in tiles),
+                                       area(bbox))
+
+    def test_elongated(self):
+        self.assertEqual(len(split_bbox([0, 0, 10, 0.001], 16)), 16)
+        self.assertEqual(len(split_bbox([0, 0, 20, 1], 16)), 16)
+
+    def test_zero_height(self):
+        tiles = split_bbox([0, 5, 10, 5], 4)
+        self.assertEqual(tiles, [[0, 5, 2.5, 5], [2.5, 5, 5, 5],
+                                 [5, 5, 7.5, 5], [7.5, 5, 10, 5]])
+
+    def test_zero_width(self):
+        tiles = split_bbox([5, 0, 5, 10], 2)
+        self.assertEqual(tiles, [[5, 0, 5, 5], [5, 5, 5, 10]])
+
+    def test_point(self):
+        self.assertEqual(split_bbox([5, 5, 5, 5], 16), [[5, 5, 5, 5]])
+
+    def test_antimeridian(self):
+        tiles = split_bbox([170, 0, -170, 5], 2)
+        self.assertEqual(tiles, [[170, 0, 180, 5], [180, 0, -170, 5]])
+
+        tiles = split_bbox([170, 0, -170, 5], 4)
+        self.assertEqual(tiles[1], [175, 0, 180, 5])
+        self.assertEqual(tiles[2], [180, 0, -175, 5])
+
+
+class SplitIntervalTest(unittest.TestCase):
+    def test_contiguous(self):
+        windows = split_interval(START, END, 3)
+        self.assertEqual(len(windows), 3)
+        self.assertEqual(windows[0][0], START)
+        self.assertEqual(windows[-1][1], END)
+        for (_, end), (start, _) in zip(windows, windows[1:]):
+            self.assertEqual(end, start)
+
+    def test_single(self):
+        self.assertEqual(split_interval(START, END, 1), [(START, END)])
+
+
+class SearchIntervalTest(unittest.TestCase):
+    def test_clipped_to_collections(self):
+        collections = [
+            Collection('a', datetime.datetime(2020, 1, 10),
+                       datetime.datetime(2020, 1, 15)),
+            Collection('b', datetime.datetime(2020, 1, 12),
+                       datetime.datetime(2020, 1, 20)),
+        ]
+        self.assertEqual(search_interval(collections, START, END),
+                         (datetime.datetime(2020, 1, 10),
+                          datetime.datetime(2020, 1, 20)))
+
+    def test_open_extent(self):
+        collections = [
+            Collection('a', datetime.datetime(2020, 1, 10), None),
+            Collection('b', None, datetime.datetime(2020, 1, 20)),
+        ]
+        self.assertEqual(search_interval(collections, START, END),
+                         (START, END))
+
+    def test_no_overlap(self):
+        collections = [Collection('a', datetime.datetime(2021, 1, 1),
+                                  datetime.datetime(2021, 2, 1))]
+        self.assertEqual(search_interval(collections, START, END),
+                         (None, None))
+
+    def test_open_search(self):
+        self.assertEqual(search_interval([], START, None), (None, None))
+
+
+class SearchPlannerTest(unittest.TestCase):
+    def test_tile_count(self):
+        planner = SearchPlanner(max_tiles=16, tile_items=100)
+        self.assertEqual(planner.tile_count(SearchResult(50), 50, 100), 1)
+        self.assertEqual(planner.tile_count(SearchResult(450), 100, 100), 5)
+        self.assertEqual(planner.tile_count(SearchResult(10 ** 6), 100, 100),
+                         16)
+
+    def test_tile_count_without_a_total(self):
+        planner = SearchPlanner(max_tiles=16, tile_items=100)
+        self.assertEqual(planner.tile_count(SearchResult(), 20, 100), 1)
+        self.assertEqual(planner.tile_count(SearchResult(), 100, 100), 4)
+        self.assertEqual(planner.tile_count(SearchResult(next='2'), 20, 100),
+                         4)
+
+    def test_cells_never_exceed_count(self):
+        planner = SearchPlanner(max_tiles=16)
+        collections = [Collection('a')]
+        for days in (1, 3, 5, 7, 30, 365):
+            end = START + datetime.timedelta(days=days)
+            for count in range(1, 17):
+                cells = planner.cells(collections, [0, 0, 10, 1], START, end,
+                                      count)
+                self.assertLessEqual(len(cells), count, (days, count))
+
+    def test_cells_split_time_first(self):
+        planner = SearchPlanner()
+        cells = planner.cells([Collection('a')], [0, 0, 1, 1], START, END, 4)
+        self.assertEqual(len(cells), 4)
+        self.assertTrue(all(bbox == [0, 0, 1, 1]
+                            for _, bbox, _, _ in cells))
+
+    def test_cells_cover_the_search(self):
+        planner = SearchPlanner()
+        collections = [Collection('a', datetime.datetime(2020, 1, 10),
+                                  datetime.datetime(2020, 1, 20))]
+        cells = planner.cells(collections, [0, 0, 1, 1], START, END, 4)
+        windows = sorted({(start, end) for _, _, start, end in cells})
+
+        self.assertEqual(len(windows), 4)
+        self.assertEqual(windows[0][0], START)
+        self.assertEqual(windows[-1][1], END)
+        for (_, end), (start, _) in zip(windows, windows[1:]):
+            self.assertEqual(end, start)
+        # sized on the extent rather than the whole search
+        self.assertEqual(windows[1][0], datetime.datetime(2020, 1, 12, 12))
+
+    def test_small_search_is_not_split(self):
+        api = API(matched=3)
+        planner = SearchPlanner(tile_items=100)
+        batches = list(planner.search_pages(api, [Collection('a')],
+                                            [0, 0, 1, 1], START, END))
+
+        self.assertEqual(len(api.searches), 1)
+        self.assertEqual([[i.id for i in b] for b in batches],
+                         [['shared', '1-a', '1-b']])
+
+    def test_large_search_is_split_and_deduplicated(self):
+        api = API(matched=400)
+        planner = SearchPlanner(max_tiles=4, tile_items=100)
+        batches = list(planner.search_pages(api, [Collection('a')],
+                                            [0, 0, 1, 1], START, END))
+
+        # the first page plus one search per cell
+        self.assertEqual(len(api.searches), 5)
+        ids = [item.id for batch in batches for item in batch]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids.count('shared'), 1)
+        self.assertEqual(len(ids), 1 + 2 * 5)
+
+    def test_max_items(self):
+        api = API(matched=400)
+        planner = SearchPlanner(max_tiles=4, tile_items=100)
+        batches = list(planner.search_pages(api, [Collection('a')],
+                                            [0, 0, 1, 1], START, END,
+                                            max_items=5))
+        self.assertEqual(sum(len(batch) for batch in batches), 5)
+
+    def test_windows_in_chronological_order(self):
+        api = SlowAPI(matched=400)
+        planner = SearchPlanner(max_tiles=4, tile_items=100)
+        batches = list(planner.search_pages(api, [Collection('a')],
+                                            [0, 0, 1, 1], START, END))
+
+        starts = [batch[0].id for batch in batches[1:]]
+        self.assertEqual(len(starts), 4)
+        self.assertEqual(starts, sorted(starts))
+
+    def search_pages(self, api, max_items=None):
+        truncated = []
+        batches = list(SearchPlanner(max_tiles=4, tile_items=100)
+                       .search_pages(api, [Collection('a')], [0, 0, 1, 1],
+                                     START, END, max_items=max_items,
+                                     on_truncated=truncated.append))
+        return batches, truncated
+
+    def test_complete(self):
+        _, truncated = self.search_pages(API(matched=400))
+        self.assertEqual(truncated, [])
+
+    def test_truncated_by_max_items(self):
+        api = API(matched=400)
+        _, truncated = self.search_pages(api, max_items=5)
+        self.assertEqual(truncated, [api])
+
+    def test_truncated_cell(self):
+        api = TruncatedAPI(matched=400)
+        batches, truncated = self.search_pages(api)
+        self.assertEqual(sum(len(batch) for batch in batches), 1 + 2 * 5)
+        self.assertEqual(truncated, [api] * 4)
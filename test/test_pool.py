@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+
+from ..utils.pool import ConnectionPool
+from ..utils.scheduler import INTERACTIVE, BULK
+
+
+class Connection:
+    sock = None
+    timeout = None
+
+    def close(self):
+        pass
+
+
+class Pool(ConnectionPool):
+    def _create(self, scheme, host, port, timeout):
+        return Connection()
+
+
+KEY = ('https', 'example.com', 443)
+
+
+def acquire(pool, priority, acquired):
+    connection, _ = pool.acquire(*KEY, 1, priority)
+    acquired.append((priority, connection))
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def test_bulk_leaves_reserved_slot(self):
+        pool = Pool(max_per_host=2, acquire_timeout=1)
+        pool.acquire(*KEY, 1, BULK)
+
+        acquired = []
+        bulk = threading.Thread(target=acquire, args=(pool, BULK, acquired))
+        bulk.start()
+        time.sleep(0.05)
+        self.assertEqual(acquired, [])
+
+        connection, _ = pool.acquire(*KEY, 1, INTERACTIVE)
+        self.assertIsInstance(connection, Connection)
+
+        pool.release(KEY, connection, False)
+        pool.release(KEY, None, False)
+        bulk.join(1)
+        self.assertEqual([p for p, _ in acquired], [BULK])
+
+    def test_interactive_served_first(self):
+        pool = Pool(max_per_host=1, acquire_timeout=1)
+        held, _ = pool.acquire(*KEY, 1, INTERACTIVE)
+
+        acquired = []
+        bulk = threading.Thread(target=acquire, args=(pool, BULK, acquired))
+        bulk.start()
+        time.sleep(0.05)
+        interactive = threading.Thread(target=acquire,
+                                       args=(pool, INTERACTIVE, acquired))
+        interactive.start()
+        time.sleep(0.05)
+
+        pool.release(KEY, held, False)
+        interactive.join(1)
+        self.assertEqual([p for p, _ in acquired], [INTERACTIVE])
+
+        pool.release(KEY, acquired[0][1], False)
+        bulk.join(1)
+        self.assertEqual([p for p, _ in acquired], [INTERACTIVE, BULK])
+
+    def test_interactive_times_out(self):
+        pool = Pool(max_per_host=1, acquire_timeout=0.05)
+        pool.acquire(*KEY, 1, INTERACTIVE)
+        with self.assertRaises(OSError):
+            pool.acquire(*KEY, 1, INTERACTIVE)
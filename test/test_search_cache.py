@@ -0,0 +1,161 @@
+import datetime
+import unittest
+
+from ..utils.search_cache import SearchCache, refines, matches, search_key
+
+START = datetime.datetime(2020, 1, 1)
+END = datetime.datetime(2020, 2, 1)
+
+
+class API:
+    href = 'https://example.com/stac'
+
+
+class Collection:
+    def __init__(self, id):
+        self.id = id
+
+
+class Item:
+    def __init__(self, id, properties):
+        self.id = id
+        self.properties = properties
+
+
+def cloud_cover(**constraint):
+    return {'eo:cloud_cover': constraint}
+
+
+class RefinesTest(unittest.TestCase):
+    def test_no_query(self):
+        self.assertTrue(refines(None, None))
+        self.assertTrue(refines(cloud_cover(lte=10), None))
+        self.assertFalse(refines(None, cloud_cover(lte=10)))
+
+    def test_narrower_range(self):
+        self.assertTrue(refines(cloud_cover(gte=20, lte=30),
+                                cloud_cover(gte=10, lte=40)))
+        self.assertFalse(refines(cloud_cover(gte=5, lte=30),
+                                 cloud_cover(gte=10, lte=40)))
+        self.assertFalse(refines(cloud_cover(gte=20, lte=50),
+                                 cloud_cover(gte=10, lte=40)))
+
+    def test_gt_and_gte_at_the_same_bound(self):
+        self.assertTrue(refines(cloud_cover(gte=10), cloud_cover(gte=10)))
+        self.assertTrue(refines(cloud_cover(gt=10), cloud_cover(gte=10)))
+        self.assertTrue(refines(cloud_cover(gt=10), cloud_cover(gt=10)))
+        self.assertFalse(refines(cloud_cover(gte=10), cloud_cover(gt=10)))
+
+    def test_lt_and_lte_at_the_same_bound(self):
+        self.assertTrue(refines(cloud_cover(lt=10), cloud_cover(lte=10)))
+        self.assertFalse(refines(cloud_cover(lte=10), cloud_cover(lt=10)))
+
+    def test_tightest_bound_counts(self):
+        self.assertTrue(refines(cloud_cover(gte=10, gt=10),
+                                cloud_cover(gt=10)))
+        self.assertFalse(refines(cloud_cover(gte=10, gt=5),
+                                 cloud_cover(gt=10)))
+        self.assertTrue(refines(cloud_cover(gte=5, gt=10),
+                                cloud_cover(gt=10)))
+        self.assertFalse(refines(cloud_cover(lte=10, lt=50),
+                                 cloud_cover(lt=10)))
+
+    def test_missing_property(self):
+        self.assertFalse(refines({'platform': {'eq': 'landsat-8'}},
+                                 cloud_cover(lte=10)))
+
+    def test_equality(self):
+        self.assertTrue(refines({'platform': {'eq': 'landsat-8'}},
+                                {'platform': {'eq': 'landsat-8'}}))
+        self.assertFalse(refines({'platform': {'eq': 'sentinel-2a'}},
+                                 {'platform': {'eq': 'landsat-8'}}))
+
+    def test_unknown_operator(self):
+        self.assertFalse(refines(cloud_cover(startsWith='1'), None))
+
+    def test_incomparable_bounds(self):
+        self.assertFalse(refines(cloud_cover(gte='a'), cloud_cover(gte=10)))
+
+
+class MatchesTest(unittest.TestCase):
+    def test_range(self):
+        query = cloud_cover(gte=10, lt=20)
+        self.assertTrue(matches({'eo:cloud_cover': 10}, query))
+        self.assertTrue(matches({'eo:cloud_cover': 19.9}, query))
+        self.assertFalse(matches({'eo:cloud_cover': 20}, query))
+        self.assertFalse(matches({'eo:cloud_cover': 9}, query))
+
+    def test_missing_or_null_property(self):
+        self.assertFalse(matches({}, cloud_cover(gte=0)))
+        self.assertFalse(matches({'eo:cloud_cover': None},
+                                 cloud_cover(gte=0)))
+
+    def test_incomparable_value(self):
+        self.assertFalse(matches({'eo:cloud_cover': 'low'},
+                                 cloud_cover(lte=10)))
+
+    def test_in(self):
+        query = {'platform': {'in': ['landsat-8', 'sentinel-2a']}}
+        self.assertTrue(matches({'platform': 'landsat-8'}, query))
+        self.assertFalse(matches({'platform': 'sentinel-1a'}, query))
+
+    def test_no_query(self):
+        self.assertTrue(matches({}, None))
+
+
+class SearchKeyTest(unittest.TestCase):
+    def test_normalized(self):
+        self.assertEqual(
+            search_key(API(), [Collection('b'), Collection('a')],
+                       [0, 0, 1, 1], START, END),
+            search_key(API(), [Collection('a'), Collection('b')],
+                       [0.0, 0.00001, 1.0, 1.0], START, END)
+        )
+        self.assertNotEqual(
+            search_key(API(), [Collection('a')], [0, 0, 1, 1], START, END),
+            search_key(API(), [Collection('a')], [0, 0, 1, 1], START, None)
+        )
+
+
+class SearchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = SearchCache()
+        self.items = [Item(str(i), {'eo:cloud_cover': i * 10})
+                      for i in range(10)]
+        self.search = (API(), [Collection('a')], [0, 0, 1, 1], START, END)
+
+    def test_same_search(self):
+        self.cache.put(*self.search, None, self.items)
+        self.assertEqual(self.cache.get(*self.search, None), self.items)
+
+    def test_miss(self):
+        self.cache.put(*self.search, None, self.items)
+        other = (API(), [Collection('b')], [0, 0, 1, 1], START, END)
+        self.assertIsNone(self.cache.get(*other, None))
+
+    def test_narrower_query_is_filtered_locally(self):
+        self.cache.put(*self.search, cloud_cover(lte=60), self.items)
+        items = self.cache.get(*self.search, cloud_cover(gt=20, lte=40))
+        self.assertEqual([item.id for item in items], ['3', '4'])
+
+    def test_incomplete_result_is_not_filtered(self):
+        self.cache.put(*self.search, None, self.items, complete=False)
+        self.assertIsNone(self.cache.get(*self.search, cloud_cover(lte=40)))
+
+    def test_projected_items_without_the_property(self):
+        self.cache.put(*self.search, None, [Item('a', {})])
+        self.assertIsNone(self.cache.get(*self.search, cloud_cover(lte=40)))
+
+    def test_expiry(self):
+        self.cache.ttl = -1
+        self.cache.put(*self.search, None, self.items)
+        self.assertIsNone(self.cache.get(*self.search, None))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.max_items = 15
+        other = (API(), [Collection('b')], [0, 0, 1, 1], START, END)
+        self.cache.put(*self.search, None, self.items)
+        self.cache.put(*other, None, self.items)
+
+        self.assertIsNone(self.cache.get(*self.search, None))
+        self.assertEqual(self.cache.get(*other, None), self.items)
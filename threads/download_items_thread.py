@@ -1,6 +1,7 @@
-import socket
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from PyQt5.QtCore import QThread, pyqtSignal
-from urllib.error import URLError
 from ..models.item import Item
 from ..utils import fs
 
@@ -12,23 +13,23 @@ class DownloadItemsThread(QThread):
     add_layer_signal = pyqtSignal(int, int, Item, str)
     finished_signal = pyqtSignal()
 
-    def __init__(self, downloads, download_directory, on_progress=None,
-                 on_error=None, on_gdal_error=None, on_add_layer=None,
-                 on_finished=None):
+    def __init__(self, downloads, download_directory, workers=4,
+                 on_progress=None, on_error=None, on_gdal_error=None,
+                 on_add_layer=None, on_finished=None):
         QThread.__init__(self)
 
         self.downloads = downloads
         self.download_directory = download_directory
+        self.workers = workers
         self.on_progress = on_progress
         self.on_error = on_error
         self.on_gdal_error = on_gdal_error
         self.on_add_layer = on_add_layer
         self.on_finished = on_finished
 
-        self._current_item = 0
-
         self._current_step = 0
         self._total_steps = 0
+        self._step_lock = threading.Lock()
         for download in self.downloads:
             item = download['item']
             options = download['options']
@@ -42,36 +43,93 @@ class DownloadItemsThread(QThread):
 
     def run(self):
         gdal_path = fs.gdal_path()
-        for i, download in enumerate(self.downloads):
-            self._current_item = i
-            item = download['item']
-            options = download['options']
-            try:
-                item.download(
-                    gdal_path,
-                    options,
-                    self.download_directory,
-                    on_update=self.on_update
+
+        rasters = {}
+        remaining = {}
+        item_futures = {}
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for i, download in enumerate(self.downloads):
+                item = download['item']
+                tasks, raster_filenames = item.download_tasks(
+                    download['options'],
+                    self.download_directory
                 )
-                if options.get('add_to_layers', False):
-                    self.add_layer_signal.emit(
-                        self._current_step,
-                        self._total_steps,
-                        item,
-                        self.download_directory
-                    )
-            except URLError as e:
-                self.error_signal.emit(item, e)
-            except socket.timeout as e:
-                self.error_signal.emit(item, e)
-            except FileNotFoundError as e:
-                self.gdal_error_signal.emit(e)
+                rasters[i] = raster_filenames
+                remaining[i] = len(tasks)
+                item_futures[i] = []
+
+                for asset, filename in tasks:
+                    future = executor.submit(self.download_asset, i, asset,
+                                             filename)
+                    futures[future] = i
+                    item_futures[i].append(future)
+
+                if len(tasks) == 0:
+                    self.finish_item(i, gdal_path, rasters[i])
+
+            for future in as_completed(futures):
+                i = futures[future]
+                if future.cancelled():
+                    continue
+
+                try:
+                    future.result()
+                except (OSError, http.client.HTTPException) as e:
+                    # network errors (URLError, socket.timeout) as well as
+                    # disk errors like a full disk are OSErrors
+                    # the item can't be completed; drop its queued assets
+                    for f in item_futures[i]:
+                        f.cancel()
+                    remaining[i] = -1
+                    self.error_signal.emit(self.downloads[i]['item'], e)
+                    continue
+
+                remaining[i] -= 1
+                if remaining[i] == 0:
+                    self.finish_item(i, gdal_path, rasters[i])
+
         self.finished_signal.emit()
 
-    def on_update(self, status):
-        self._current_step += 1
+    def download_asset(self, i, asset, filename):
+        self.on_update(i, f'Downloading {asset.href}', 0)
+        item = self.downloads[i]['item']
+        if item.download_asset(asset, filename):
+            self.on_update(i, f'Downloaded {asset.href}', 1)
+        else:
+            self.on_update(i, f'Already downloaded {asset.href}', 1)
+
+    def finish_item(self, i, gdal_path, raster_filenames):
+        item = self.downloads[i]['item']
+        options = self.downloads[i]['options']
+        if not options.get('add_to_layers', False):
+            return
+
+        self.on_update(i, 'Building Virtual Raster...', 0)
+        try:
+            item.build_vrt(gdal_path, raster_filenames,
+                           self.download_directory)
+        except FileNotFoundError as e:
+            self.gdal_error_signal.emit(e)
+            return
+
+        with self._step_lock:
+            self._current_step += 1
+            current_step = self._current_step
+        self.add_layer_signal.emit(
+            current_step,
+            self._total_steps,
+            item,
+            self.download_directory
+        )
+
+    def on_update(self, i, status, completed_steps):
+        with self._step_lock:
+            self._current_step += completed_steps
+            current_step = self._current_step
         self.progress_signal.emit(
-            self._current_step,
+            current_step,
             self._total_steps,
-            f'[{self._current_item + 1}/{len(self.downloads)}] {status}'
+            f'[{i + 1}/{len(self.downloads)}] {status}'
         )
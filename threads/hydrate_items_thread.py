@@ -0,0 +1,47 @@
+import http.client
+import socket
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt5.QtCore import QThread, pyqtSignal
+from urllib.error import URLError
+from ..models.item import Item
+
+
+class HydrateItemsThread(QThread):
+    item_signal = pyqtSignal(Item)
+    error_signal = pyqtSignal(Item, Exception)
+    finished_signal = pyqtSignal(list)
+
+    def __init__(self, items, workers=4, on_item=None, on_error=None,
+                 on_finished=None):
+        QThread.__init__(self)
+
+        self.items = items
+        self.workers = workers
+        self.on_item = on_item
+        self.on_error = on_error
+        self.on_finished = on_finished
+
+        if self.on_item is not None:
+            self.item_signal.connect(self.on_item)
+        if self.on_error is not None:
+            self.error_signal.connect(self.on_error)
+        if self.on_finished is not None:
+            self.finished_signal.connect(self.on_finished)
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(item.hydrate): item
+                for item in self.items if item.partial
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    future.result()
+                except (URLError, socket.timeout,
+                        http.client.HTTPException, ValueError) as e:
+                    self.error_signal.emit(item, e)
+                    continue
+                self.item_signal.emit(item)
+
+        self.finished_signal.emit(self.items)
@@ -1,4 +1,6 @@
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
 from PyQt5.QtCore import QThread, pyqtSignal
 from urllib.error import URLError
 from ..models.api import API
@@ -7,32 +9,96 @@ from ..models.api import API
 class LoadCollectionsThread(QThread):
     progress_signal = pyqtSignal(float, str)
     error_signal = pyqtSignal(Exception, API)
+    collection_error_signal = pyqtSignal(Exception, API, str)
     finished_signal = pyqtSignal(list)
 
-    def __init__(self, api_list, on_progress=None, on_error=None,
-                 on_finished=None):
+    def __init__(self, api_list, timeout=None, on_progress=None,
+                 on_error=None, on_collection_error=None, on_finished=None):
         QThread.__init__(self)
 
         self.api_list = api_list
+        self.timeout = timeout
         self.on_progress = on_progress
         self.on_error = on_error
+        self.on_collection_error = on_collection_error
         self.on_finished = on_finished
 
+        self._progress = [0.0 for _ in self.api_list]
+        self._progress_lock = threading.Lock()
+        self._stop = threading.Event()
+
         self.progress_signal.connect(self.on_progress)
         self.error_signal.connect(self.on_error)
+        self.collection_error_signal.connect(self.on_collection_error)
         self.finished_signal.connect(self.on_finished)
 
     def run(self):
-        apis = []
-        for i, api in enumerate(self.api_list):
-            progress = (float(i) / float(len(self.api_list)))
-            self.progress_signal.emit(progress, api.href)
-            try:
-                api.load()
-                apis.append(api)
-            except URLError as e:
-                self.error_signal.emit(e, api)
-            except socket.timeout as e:
-                self.error_signal.emit(e, api)
+        if len(self.api_list) == 0:
+            self.finished_signal.emit([])
+            return
+
+        # a catalog that fails or times out keeps what it was before this
+        # load rather than dropping out of the list
+        previous = [API(api.json) for api in self.api_list]
+
+        loaded = [False for _ in self.api_list]
+        executor = ThreadPoolExecutor(max_workers=len(self.api_list))
+        futures = {
+            executor.submit(self.load_api, i, api): i
+            for i, api in enumerate(self.api_list)
+        }
+
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                i = futures[future]
+                api = self.api_list[i]
+                try:
+                    future.result()
+                    loaded[i] = True
+                except URLError as e:
+                    self.error_signal.emit(e, api)
+                except socket.timeout as e:
+                    self.error_signal.emit(e, api)
+                except Exception as e:
+                    # a catalog that fails in any other way must not keep
+                    # the rest from loading
+                    self.error_signal.emit(e, api)
+                self.update_progress(i, 1.0)
+        except TimeoutError:
+            self._stop.set()
+            for future, i in futures.items():
+                if future.done():
+                    continue
+                future.cancel()
+                self.error_signal.emit(
+                    socket.timeout(f'no response within {self.timeout}s'),
+                    self.api_list[i]
+                )
+
+        # loads that missed the deadline are abandoned rather than awaited
+        executor.shutdown(wait=False)
 
+        apis = [
+            api if loaded[i] else previous[i]
+            for i, api in enumerate(self.api_list)
+        ]
         self.finished_signal.emit(apis)
+
+    def load_api(self, i, api):
+        self.update_progress(i, 0.0)
+
+        def on_collection_loaded(completed, total):
+            self.update_progress(i, float(completed) / float(total))
+
+        def on_collection_error(collection_id, e):
+            self.collection_error_signal.emit(e, api, collection_id)
+
+        api.load(on_collection_loaded=on_collection_loaded,
+                 on_collection_error=on_collection_error,
+                 stop=self._stop)
+
+    def update_progress(self, i, progress):
+        with self._progress_lock:
+            self._progress[i] = progress
+            total = sum(self._progress) / float(len(self._progress))
+        self.progress_signal.emit(total, self.api_list[i].href)
@@ -1,59 +1,177 @@
+import functools
 import socket
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from PyQt5.QtCore import QThread, pyqtSignal
 from urllib.error import URLError
-from ..models.api import API
+from ..models.api import API, SEARCH_MAX_ITEMS, SEARCH_MAX_BYTES
+from ..models.saved_search import SavedSearch
+from ..utils.search_cache import search_cache
+from ..utils.saved_searches import saved_searches
 
 
 class LoadItemsThread(QThread):
     progress_signal = pyqtSignal(API, list, int)
+    items_signal = pyqtSignal(API, list)
+    api_error_signal = pyqtSignal(Exception, API)
     error_signal = pyqtSignal(Exception)
     finished_signal = pyqtSignal(list)
 
     def __init__(self, api_collections, extent, start_time, end_time, query,
-                 on_progress=None, on_error=None, on_finished=None):
+                 page_tuners={}, max_items=SEARCH_MAX_ITEMS,
+                 max_bytes=SEARCH_MAX_BYTES, planner=None, incremental=False,
+                 on_progress=None, on_items=None, on_api_error=None,
+                 on_error=None, on_finished=None):
         QThread.__init__(self)
-        self.current_page = 0
 
         self.api_collections = api_collections
         self.extent = extent
         self.start_time = start_time
         self.end_time = end_time
         self.query = query
+        self.page_tuners = page_tuners
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.planner = planner
+        self.incremental = incremental
         self.on_progress = on_progress
+        self.on_items = on_items
+        self.on_api_error = on_api_error
         self.on_error = on_error
         self.on_finished = on_finished
-        self._current_collections = []
+
+        self._all_items = []
+        self._items_lock = threading.Lock()
 
         self.progress_signal.connect(self.on_progress)
+        self.items_signal.connect(self.on_items)
+        self.api_error_signal.connect(self.on_api_error)
         self.error_signal.connect(self.on_error)
         self.finished_signal.connect(self.on_finished)
 
     def run(self):
-        try:
-            all_items = []
-            for api_collection in self.api_collections:
-                self.current_page = 0
-                api = api_collection['api']
-                collections = api_collection['collections']
-                self._current_collections = collections
-
-                items = api.search_items(collections,
-                                         self.extent,
-                                         self.start_time,
-                                         self.end_time,
-                                         self.query,
-                                         on_next_page=self.on_next_page)
-                all_items.extend(items)
-            self.finished_signal.emit(all_items)
-        except URLError as e:
-            self.error_signal.emit(e)
-        except socket.timeout as e:
-            self.error_signal.emit(e)
-
-    def on_next_page(self, api):
-        self.current_page += 1
-        self.progress_signal.emit(
-            api,
-            self._current_collections,
-            self.current_page
-        )
+        if len(self.api_collections) == 0:
+            self.finished_signal.emit([])
+            return
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=len(self.api_collections)) \
+                as executor:
+            futures = {
+                executor.submit(self.search_api, api_collection):
+                api_collection['api']
+                for api_collection in self.api_collections
+            }
+            for future in as_completed(futures):
+                api = futures[future]
+                try:
+                    future.result()
+                except URLError as e:
+                    errors.append(e)
+                    self.api_error_signal.emit(e, api)
+                except socket.timeout as e:
+                    errors.append(e)
+                    self.api_error_signal.emit(e, api)
+                except http.client.HTTPException as e:
+                    errors.append(e)
+                    self.api_error_signal.emit(e, api)
+                except ValueError as e:
+                    # the search answered with something that isn't a
+                    # FeatureCollection, like an HTML error page
+                    errors.append(e)
+                    self.api_error_signal.emit(e, api)
+
+        if len(errors) == len(self.api_collections):
+            self.error_signal.emit(errors[-1])
+            return
+
+        self.finished_signal.emit(self._all_items)
+
+    def search_api(self, api_collection):
+        api = api_collection['api']
+        collections = api_collection['collections']
+        current_page = 0
+
+        search = (api, collections, self.extent, self.start_time,
+                  self.end_time, self.query)
+        cached = search_cache.get(*search)
+        if cached is not None:
+            self.progress_signal.emit(api, collections, 0)
+            with self._items_lock:
+                self._all_items.extend(cached)
+            self.items_signal.emit(api, cached)
+            return
+
+        # an incremental search that ran before only needs what is newer
+        # than the result set it left behind
+        saved = None
+        stored = []
+        known = set()
+        start_time = self.start_time
+        if self.incremental and self.end_time is not None:
+            saved = saved_searches.get(api, collections, self.extent,
+                                       self.start_time, self.query)
+        if saved is not None and saved.end_time is not None \
+                and self.end_time >= saved.end_time:
+            start_time = saved.delta_start(collections, self.start_time)
+            stored = saved.items(api)
+            known = {(item.collection_id, item.id) for item in stored}
+            with self._items_lock:
+                self._all_items.extend(stored)
+            self.items_signal.emit(api, stored)
+        else:
+            saved = None
+
+        def on_next_page(api):
+            nonlocal current_page
+            current_page += 1
+            self.progress_signal.emit(api, collections, current_page)
+
+        truncated = False
+
+        def on_truncated(api):
+            nonlocal truncated
+            truncated = True
+
+        search_pages = api.search_pages
+        if self.planner is not None:
+            search_pages = functools.partial(self.planner.search_pages, api)
+
+        pages = search_pages(collections,
+                             self.extent,
+                             start_time,
+                             self.end_time,
+                             self.query,
+                             on_next_page=on_next_page,
+                             tuner=self.page_tuners.get(api.id, None),
+                             max_items=self.max_items,
+                             max_bytes=self.max_bytes,
+                             on_truncated=on_truncated)
+        found = []
+        for items in pages:
+            items = [item for item in items
+                     if (item.collection_id, item.id) not in known]
+            if len(items) == 0:
+                continue
+            found.extend(items)
+            with self._items_lock:
+                self._all_items.extend(items)
+            self.items_signal.emit(api, items)
+
+        # a result cut off by the budget can't stand in for narrower
+        # searches or be extended by later ones
+        complete = not truncated
+        search_cache.put(*search, stored + found, complete=complete)
+
+        if not self.incremental:
+            return
+
+        if saved is not None and complete:
+            saved.merge(collections, found, self.end_time)
+        elif saved is None and complete and self.end_time is not None:
+            saved = SavedSearch.create(collections, found, self.end_time,
+                                       partial=api.capabilities.fields)
+        if saved is not None:
+            saved_searches.put(api, collections, self.extent,
+                               self.start_time, self.query, saved)
@@ -2,6 +2,7 @@ import socket
 from PyQt5.QtCore import QThread, pyqtSignal
 from urllib.error import URLError
 from ..utils import network
+from ..utils.scheduler import THUMBNAIL
 from ..models.item import Item
 
 
@@ -17,7 +18,9 @@ class LoadPreviewThread(QThread):
 
     def run(self):
         try:
-            network.download(self.item.thumbnail_url, self.item.thumbnail_path)
+            network.download(self.item.thumbnail_url,
+                             self.item.thumbnail_path,
+                             priority=THUMBNAIL)
             self.finished_signal.emit(self.item, False)
         except URLError:
             self.finished_signal.emit(self.item, True)
@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+import threading
+
+from . import metrics
+
+
+class ResponseCache:
+    """Responses kept on disk with their validators for conditional GETs."""
+
+    def __init__(self, directory, max_size=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._index = None
+
+    @property
+    def stats(self):
+        return {
+            'hits': metrics.counter('http_cache.hit'),
+            'misses': metrics.counter('http_cache.miss'),
+        }
+
+    def validators(self, url):
+        meta = self._read_meta(self._key(url))
+        if meta is None:
+            return {}
+
+        headers = {}
+        if meta.get('etag') is not None:
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified') is not None:
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def get(self, url):
+        key = self._key(url)
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        with self._lock:
+            self._load_index()
+            self._index[key] = (len(body), self._touch(key))
+        return body
+
+    def store(self, url, headers, body):
+        etag = headers.get('ETag', None)
+        last_modified = headers.get('Last-Modified', None)
+        if etag is None and last_modified is None:
+            return
+
+        key = self._key(url)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified}
+
+        with self._lock:
+            self._load_index()
+            os.makedirs(self.directory, exist_ok=True)
+
+            # write to temporary files first so a concurrent reader never
+            # sees a body that doesn't match its validators
+            for path, data in ((self._body_path(key), body),
+                               (self._meta_path(key),
+                                json.dumps(meta).encode('utf-8'))):
+                with open(f'{path}.tmp', 'wb') as f:
+                    f.write(data)
+                os.replace(f'{path}.tmp', path)
+
+            self._index[key] = (len(body), self._touch(key))
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key in list(self._index.keys()):
+                self._remove(key)
+
+    def _evict(self):
+        total = sum(size for size, _ in self._index.values())
+        by_access = sorted(self._index.items(), key=lambda e: e[1][1])
+        for key, (size, _) in by_access:
+            if total <= self.max_size:
+                break
+            self._remove(key)
+            total -= size
+
+    def _remove(self, key):
+        for path in (self._body_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._index.pop(key, None)
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+
+        self._index = {}
+        if not os.path.isdir(self.directory):
+            return
+
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.body'):
+                continue
+            stat = os.stat(os.path.join(self.directory, filename))
+            self._index[filename[:-len('.body')]] = (stat.st_size,
+                                                     stat.st_mtime)
+
+    def _touch(self, key):
+        path = self._body_path(key)
+        try:
+            os.utime(path)
+            return os.stat(path).st_mtime
+        except OSError:
+            return 0
+
+    def _read_meta(self, key):
+        try:
+            with open(self._meta_path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, f'{key}.body')
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
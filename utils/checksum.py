@@ -0,0 +1,109 @@
+import hashlib
+import urllib.error
+
+DEFAULT_ALGORITHM = 'sha256'
+
+# multihash function codes understood by file:checksum
+MULTIHASH_CODES = {
+    0x11: 'sha1',
+    0x12: 'sha256',
+    0x13: 'sha512',
+    0x14: 'sha3_512',
+    0x15: 'sha3_384',
+    0x16: 'sha3_256',
+    0x17: 'sha3_224',
+    0x20: 'sha384',
+    0xd5: 'md5',
+}
+ALGORITHM_CODES = {name: code for code, name in MULTIHASH_CODES.items()}
+
+
+class ChecksumError(urllib.error.URLError):
+    """Raised when downloaded content doesn't match its expected checksum.
+
+    Like ContentTooShortError this is a URLError, so it is retried and
+    reported the same way as any other failed download.
+    """
+
+    def __init__(self, url, message):
+        super().__init__(f'{url}: {message}')
+        self.url = url
+
+
+def algorithm(checksum):
+    """Return the hashlib name for a multihash hex string, or None."""
+    parsed = parse(checksum)
+    if parsed is None:
+        return None
+    return parsed[0]
+
+
+def parse(checksum):
+    """Split a multihash hex string into (algorithm, digest bytes).
+
+    Returns None for checksums that aren't valid multihashes or use a
+    function we can't compute.
+    """
+    if checksum is None:
+        return None
+
+    try:
+        data = bytes.fromhex(checksum)
+        code, i = _varint(data, 0)
+        length, i = _varint(data, i)
+    except (ValueError, IndexError):
+        return None
+
+    name = MULTIHASH_CODES.get(code, None)
+    digest = data[i:]
+    if name is None or len(digest) != length \
+            or name not in hashlib.algorithms_available:
+        return None
+    return name, digest
+
+
+def multihash(hasher):
+    """Encode a finished hashlib object as a multihash hex string."""
+    digest = hasher.digest()
+    return (_encode_varint(ALGORITHM_CODES[hasher.name])
+            + _encode_varint(len(digest))
+            + digest).hex()
+
+
+def new(name=None):
+    return hashlib.new(name or DEFAULT_ALGORITHM)
+
+
+def file_hasher(path, name=None, chunk_size=1024 * 1024):
+    hasher = new(name)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher
+
+
+def _varint(data, i):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[i]
+        value |= (byte & 0x7f) << shift
+        i += 1
+        if byte & 0x80 == 0:
+            return value, i
+        shift += 7
+
+
+def _encode_varint(value):
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
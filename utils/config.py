@@ -21,7 +21,17 @@ class Config:
             'apis': [api.json for api in self.apis],
             'download_directory': self.download_directory,
             'last_update': self.last_update,
-            'api_update_interval': self.api_update_interval
+            'api_update_interval': self.api_update_interval,
+            'api_load_timeout': self.api_load_timeout,
+            'download_workers': self.download_workers,
+            'bandwidth_limit': self.bandwidth_limit,
+            'search_min_page_size': self.search_min_page_size,
+            'search_max_page_size': self.search_max_page_size,
+            'search_max_items': self.search_max_items,
+            'search_max_bytes': self.search_max_bytes,
+            'search_max_tiles': self.search_max_tiles,
+            'search_cache_ttl': self.search_cache_ttl,
+            'page_tuning': self.page_tuning
         }
         with open(self.path, 'w') as f:
             f.write(json.dumps(config))
@@ -67,6 +77,52 @@ class Config:
     def api_update_interval(self):
         return self._json.get('api_update_interval', 60 * 60 * 24)
 
+    @property
+    def api_load_timeout(self):
+        return self._json.get('api_load_timeout', 60)
+
+    @property
+    def download_workers(self):
+        return self._json.get('download_workers', 4)
+
+    @property
+    def bandwidth_limit(self):
+        return self._json.get('bandwidth_limit', None)
+
+    @property
+    def search_min_page_size(self):
+        return self._json.get('search_min_page_size', 10)
+
+    @property
+    def search_max_page_size(self):
+        return self._json.get('search_max_page_size', 500)
+
+    @property
+    def search_max_items(self):
+        return self._json.get('search_max_items', 5000)
+
+    @property
+    def search_max_bytes(self):
+        return self._json.get('search_max_bytes', 256 * 1024 * 1024)
+
+    @property
+    def search_max_tiles(self):
+        # 1 turns spatial tiling of large searches off
+        return self._json.get('search_max_tiles', 16)
+
+    @property
+    def search_cache_ttl(self):
+        return self._json.get('search_cache_ttl', 600)
+
+    @property
+    def page_tuning(self):
+        return self._json.get('page_tuning', {})
+
+    def set_page_tuning(self, api_id, state):
+        page_tuning = self.page_tuning
+        page_tuning[api_id] = state
+        self._json['page_tuning'] = page_tuning
+
     @last_update.setter
     def last_update(self, value):
         self._json['last_update'] = value
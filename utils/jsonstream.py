@@ -0,0 +1,226 @@
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r'\s*')
+STRUCTURAL = re.compile(r'[{}\[\]"]')
+STRING_SPECIAL = re.compile(r'["\\]')
+LITERAL_END = re.compile(r'[,}\]\s]')
+
+
+class FeatureCollectionParser:
+    """Incremental parser for a GeoJSON FeatureCollection document.
+
+    Text is fed as it arrives; every complete element of the top-level
+    "features" array is returned by feed() as soon as it has been read.
+    All other top-level members are collected into envelope.
+    """
+
+    def __init__(self):
+        self.envelope = {}
+
+        self._buffer = ''
+        self._pos = 0
+        self._state = 'start'
+        self._key = None
+        self._scan = None
+        self._final = False
+
+    def feed(self, text):
+        self._buffer = self._buffer[self._pos:] + text
+        if self._scan is not None:
+            self._scan[0] -= self._pos
+        self._pos = 0
+
+        return self._parse()
+
+    def close(self):
+        self._final = True
+        features = self._parse()
+
+        if self._state != 'done':
+            raise ValueError('Incomplete JSON document')
+        return features
+
+    def _parse(self):
+        features = []
+
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos >= len(self._buffer):
+                break
+
+            c = self._buffer[self._pos]
+            state = self._state
+
+            if state == 'start':
+                self._expect(c, '{')
+                self._state = 'key'
+            elif state == 'key':
+                if c == '}':
+                    self._pos += 1
+                    self._state = 'done'
+                    continue
+                key = self._value()
+                if key is None:
+                    break
+                self._key = key
+                self._state = 'colon'
+            elif state == 'colon':
+                self._expect(c, ':')
+                self._state = 'features' if self._key == 'features' \
+                    else 'value'
+            elif state == 'value':
+                value = self._value()
+                if value is None and self._scan is not None:
+                    break
+                self.envelope[self._key] = value
+                self._state = 'member_end'
+            elif state == 'member_end':
+                if c == '}':
+                    self._state = 'done'
+                else:
+                    self._expect(c, ',')
+                    self._state = 'key'
+                    continue
+                self._pos += 1
+            elif state == 'features':
+                if c != '[':
+                    self._state = 'value'
+                    continue
+                self._pos += 1
+                self.envelope['features'] = []
+                self._state = 'feature'
+            elif state == 'feature':
+                if c == ']':
+                    self._pos += 1
+                    self._state = 'member_end'
+                    continue
+                feature = self._value()
+                if feature is None and self._scan is not None:
+                    break
+                if feature is not None:
+                    features.append(feature)
+                self._state = 'feature_end'
+            elif state == 'feature_end':
+                if c == ']':
+                    self._state = 'member_end'
+                else:
+                    self._expect(c, ',')
+                    self._state = 'feature'
+                    continue
+                self._pos += 1
+            else:
+                raise ValueError(f'Unexpected data after JSON document: {c}')
+
+        return features
+
+    def _expect(self, c, expected):
+        if c != expected:
+            raise ValueError(f'Expected {expected!r} but found {c!r}')
+        self._pos += 1
+
+    def _value(self):
+        """Decode the value at the current position.
+
+        Returns None and remembers how far it scanned when the value isn't
+        complete yet.
+        """
+        end = self._value_end()
+        if end is None:
+            return None
+
+        value = json.loads(self._buffer[self._pos:end])
+        self._pos = end
+        self._scan = None
+        return value
+
+    def _value_end(self):
+        buffer = self._buffer
+        if self._scan is None:
+            first = buffer[self._pos]
+            if first in '{[':
+                self._scan = [self._pos + 1, 1, False]
+            elif first == '"':
+                self._scan = [self._pos + 1, 0, True]
+            else:
+                self._scan = [self._pos, 0, False]
+
+        i, depth, in_string = self._scan
+
+        if depth == 0 and not in_string and buffer[self._pos] != '"':
+            m = LITERAL_END.search(buffer, i)
+            if m is not None:
+                return m.start()
+            if self._final:
+                return len(buffer)
+            self._scan[0] = len(buffer)
+            return None
+
+        while True:
+            if in_string:
+                m = STRING_SPECIAL.search(buffer, i)
+                if m is None:
+                    i = len(buffer)
+                    break
+                if m.group() == '\\':
+                    if m.end() >= len(buffer):
+                        i = m.start()
+                        break
+                    i = m.end() + 1
+                    continue
+                in_string = False
+                i = m.end()
+                if depth == 0:
+                    return i
+            else:
+                m = STRUCTURAL.search(buffer, i)
+                if m is None:
+                    i = len(buffer)
+                    break
+                c = m.group()
+                i = m.end()
+                if c == '"':
+                    in_string = True
+                elif c in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return i
+
+        self._scan = [i, depth, in_string]
+        return None
+
+
+class FeatureStream:
+    """Iterate over the features of a FeatureCollection response body."""
+
+    def __init__(self, response, chunk_size=CHUNK_SIZE):
+        self._response = response
+        self._chunk_size = chunk_size
+        self._parser = FeatureCollectionParser()
+        self.bytes_read = 0
+
+    @property
+    def envelope(self):
+        return self._parser.envelope
+
+    def __iter__(self):
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            while True:
+                chunk = self._response.read(self._chunk_size)
+                if not chunk:
+                    break
+                self.bytes_read += len(chunk)
+                for feature in self._parser.feed(decoder.decode(chunk)):
+                    yield feature
+
+            self._parser.feed(decoder.decode(b'', final=True))
+            for feature in self._parser.close():
+                yield feature
+        finally:
+            self._response.close()
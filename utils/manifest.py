@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+
+MANIFEST_NAME = 'manifest.json'
+
+_lock = threading.Lock()
+
+
+def intact(path, checksum=None, size=None):
+    """Whether path is unchanged since it was recorded as downloaded.
+
+    The file isn't read again: it is trusted when its size and mtime still
+    match the manifest and the recorded hash agrees with checksum.
+    """
+    with _lock:
+        entry = _read(os.path.dirname(path)).get(os.path.basename(path))
+
+    if entry is None or not os.path.exists(path):
+        return False
+
+    stat = os.stat(path)
+    if stat.st_size != entry.get('size') \
+            or stat.st_mtime != entry.get('mtime'):
+        return False
+    if size is not None and size != entry.get('size'):
+        return False
+    if checksum is not None \
+            and checksum.lower() != entry.get('checksum'):
+        return False
+    return True
+
+
+def record(path, url, checksum=None):
+    """Note path as downloaded from url.
+
+    checksum is None for a file that wasn't hashed; the entry then only
+    vouches for its size and mtime.
+    """
+    directory = os.path.dirname(path)
+    stat = os.stat(path)
+
+    with _lock:
+        entries = _read(directory)
+        entries[os.path.basename(path)] = {
+            'url': url,
+            'checksum': checksum,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+        }
+
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        tmp_path = f'{manifest_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+
+def _read(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
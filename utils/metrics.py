@@ -0,0 +1,39 @@
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_timings = {}
+
+
+def increment(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name, value):
+    with _lock:
+        count, total, maximum = _timings.get(name, (0, 0.0, 0.0))
+        _timings[name] = (count + 1, total + value, max(maximum, value))
+
+
+def counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot():
+    with _lock:
+        timings = {}
+        for name, (count, total, maximum) in _timings.items():
+            timings[name] = {
+                'count': count,
+                'mean': total / count,
+                'max': maximum,
+            }
+        return {'counters': dict(_counters), 'timings': timings}
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _timings.clear()
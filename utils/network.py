@@ -1,8 +1,45 @@
 import ssl
+import io
+import re
 import urllib
-import shutil
+import urllib.error
+import urllib.request
+import http.client
 import json
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urljoin
+
+from .pool import ConnectionPool
+from .cache import ResponseCache
+from .retry import RetryPolicy, LatencyTracker
+from .throttle import Throttle
+from .jsonstream import FeatureStream
+from .singleflight import SingleFlight
+from .scheduler import BandwidthScheduler, INTERACTIVE, BULK
+from . import checksum as checksums
+from . import metrics
+
+REQUEST_DEADLINE = 120
+CHUNK_SIZE = 64 * 1024
+PART_SUFFIX = '.part'
+SEGMENT_THRESHOLD = 64 * 1024 * 1024
+SEGMENT_MIN_SIZE = 16 * 1024 * 1024
+SEGMENT_CHECKPOINT = 8 * 1024 * 1024
+SEGMENT_WORKERS = 4
+MAX_REDIRECTS = 5
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Errors raised when a keep-alive connection was closed by the server while
+# it sat idle in the pool; the request is safe to send again on a new socket.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
 
 
 def ssl_context():
@@ -11,28 +48,549 @@ def ssl_context():
     return ssl.SSLContext()
 
 
-def request(url, data=None):
-    r = urllib.request.Request(url)
+pool = ConnectionPool(context_factory=ssl_context)
+retry_policy = RetryPolicy()
+latency = LatencyTracker()
+throttle = Throttle()
+in_flight = SingleFlight()
+scheduler = BandwidthScheduler()
+response_cache = ResponseCache(os.path.join(
+    os.path.split(os.path.dirname(__file__))[0],
+    'cache',
+    'http'
+))
+
+
+class Response:
+    def __init__(self, url, response, release, priority=INTERACTIVE):
+        self.url = url
+        self._response = response
+        self._release = release
+        self._priority = priority
+
+        scheduler.begin(priority)
+
+    @property
+    def status(self):
+        return self._response.status
+
+    @property
+    def reason(self):
+        return self._response.reason
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def read(self, amt=None):
+        data = self._response.read(amt)
+        scheduler.consume(self._priority, len(data))
+        return data
+
+    def readinto(self, b):
+        size = self._response.readinto(b)
+        scheduler.consume(self._priority, size)
+        return size
+
+    def close(self):
+        if self._release is None:
+            return
+
+        reusable = self._response.isclosed() and not self._response.will_close
+        if not reusable:
+            self._response.close()
+        self._release(reusable)
+        self._release = None
+        scheduler.end(self._priority)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def urlopen(url, data=None, headers={}, method=None, timeout=None,
+            priority=INTERACTIVE):
+    """Open url on a pooled connection.
+
+    timeout is the read timeout in seconds; when omitted, connect and read
+    timeouts are derived from the latency observed for the host. priority
+    is the scheduler class the response body is read under.
+    """
+    if method is None:
+        method = 'GET' if data is None else 'POST'
+
+    for _ in range(MAX_REDIRECTS + 1):
+        response = _open(url, data, headers, method, timeout, priority)
+
+        location = response.getheader('Location')
+        if response.status not in REDIRECT_CODES or location is None:
+            break
+
+        try:
+            response.read()
+        finally:
+            response.close()
+
+        url = urljoin(url, location)
+        if response.status not in (307, 308):
+            if method != 'HEAD':
+                method = 'GET'
+            data = None
+    else:
+        raise urllib.error.HTTPError(url, response.status,
+                                     'Too many redirects', response.headers,
+                                     None)
+
+    if response.status >= 400:
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        raise urllib.error.HTTPError(url, response.status, response.reason,
+                                     response.headers, io.BytesIO(body))
+
+    return response
+
+
+def request(url, data=None, cache=False, deadline=REQUEST_DEADLINE):
+    body_bytes = None
     if data is not None:
         body_bytes = json.dumps(data).encode('utf-8')
-        r.add_header('Content-Type', 'application/json; charset=utf-8')
-        r.add_header('Content-Length', len(body_bytes))
-        r = urllib.request.urlopen(
-            r,
-            body_bytes,
-            context=ssl_context(),
-            timeout=5
-        )
-    else:
-        r = urllib.request.urlopen(r, context=ssl_context(), timeout=5)
 
-    return json.loads(r.read())
+    # followers share the raw body and decode their own copy of it
+    body, shared = in_flight.do(
+        ('request', url, body_bytes, cache),
+        lambda: _request(url, body_bytes, cache, deadline)
+    )
+    if shared:
+        metrics.increment('http.coalesced')
+    return json.loads(body)
+
+
+def _request(url, body_bytes, cache, deadline):
+    headers = {'Accept': 'application/json'}
+    if body_bytes is not None:
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+
+    # only idempotent GETs are cached; search bodies are never cached here
+    cache = cache and body_bytes is None
+    if cache:
+        headers.update(response_cache.validators(url))
+
+    def attempt():
+        with urlopen(url, body_bytes, headers) as r:
+            return r.status, r.headers, r.read()
+
+    status, response_headers, body = retry_policy.call(
+        attempt,
+        host=urlsplit(url).hostname,
+        deadline=time.monotonic() + deadline,
+        latency=latency
+    )
+
+    if status == 304:
+        cached = response_cache.get(url)
+        if cached is not None:
+            metrics.increment('http_cache.hit')
+            return cached
+        return _request(url, None, False, deadline)
+
+    if cache:
+        metrics.increment('http_cache.miss')
+        response_cache.store(url, response_headers, body)
+
+    return body
+
+
+def request_features(url, data=None, deadline=REQUEST_DEADLINE):
+    """Like request, but decode a FeatureCollection while it arrives.
+
+    Only opening the response is retried; once features have been handed
+    out, a failure while reading the rest of the body is raised.
+    """
+    headers = {'Accept': 'application/geo+json, application/json'}
+    body_bytes = None
+    if data is not None:
+        body_bytes = json.dumps(data).encode('utf-8')
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+
+    response = retry_policy.call(
+        lambda: urlopen(url, body_bytes, headers),
+        host=urlsplit(url).hostname,
+        deadline=time.monotonic() + deadline,
+        latency=latency
+    )
+    return FeatureStream(response)
+
+
+def download(url, path, priority=BULK, checksum=None, size=None):
+    """Download url to path and return the file's multihash.
+
+    The content is hashed as it is written. When checksum (a file:checksum
+    multihash) or size is given and the result doesn't match, the partial
+    file is discarded and the download is retried from scratch. A large
+    file without a checksum is fetched in concurrent segments instead and
+    isn't hashed, nor is one resumed without a checksum; None is returned
+    for those.
+    """
+    result, shared = in_flight.do(
+        ('download', url, path, checksum, size),
+        lambda: _download(url, path, priority, checksum, size)
+    )
+    if shared:
+        metrics.increment('http.coalesced')
+    return result
+
+
+def _download(url, path, priority, checksum, size):
+    part_path = f'{path}{PART_SUFFIX}'
+    state_path = f'{part_path}.json'
+    expected = checksums.parse(checksum)
+    algorithm = expected[0] if expected is not None else None
+
+    def attempt():
+        hasher = _download_part(url, part_path, state_path, priority,
+                                algorithm)
+
+        error = None
+        if size is not None and os.path.getsize(part_path) != size:
+            error = f'expected {size} bytes, got {os.path.getsize(part_path)}'
+        elif expected is not None and hasher.digest() != expected[1]:
+            error = 'checksum mismatch'
+
+        if error is not None:
+            metrics.increment('download.checksum_mismatch')
+            _remove(part_path)
+            _remove(state_path)
+            raise checksums.ChecksumError(url, error)
+        return hasher
+
+    # each attempt resumes from whatever the previous one left behind
+    hasher = retry_policy.call(
+        attempt,
+        host=urlsplit(url).hostname,
+        latency=latency
+    )
+
+    os.replace(part_path, path)
+    _remove(state_path)
+    if hasher is None:
+        return None
+    return checksums.multihash(hasher)
+
+
+def _download_part(url, part_path, state_path, priority, algorithm=None):
+    """Fetch whatever part_path is missing and return a hasher of all of it.
+
+    Without an algorithm to verify, None is returned rather than reading
+    back what was written earlier or out of order.
+    """
+    state = _read_state(state_path)
+    if state is None or state.get('url') != url \
+            or not os.path.exists(part_path):
+        state = None
+
+    if state is not None and 'segments' in state:
+        _download_segments(url, part_path, state_path, state, priority)
+        return _read_back(part_path, algorithm)
+
+    offset = 0
+    if state is not None:
+        offset = os.path.getsize(part_path)
+
+    size = state.get('size') if offset > 0 else None
+    if size is not None and offset == size:
+        return _read_back(part_path, algorithm)
+
+    headers = {}
+    if offset > 0:
+        headers['Range'] = f'bytes={offset}-'
+        headers.update(_if_range(state))
+
+    try:
+        response = urlopen(url, headers=headers, priority=priority)
+    except urllib.error.HTTPError as e:
+        if e.code != 416 or offset == 0:
+            raise
+        # our partial file doesn't fit the remote one; start over
+        _remove(part_path)
+        _remove(state_path)
+        return _download_part(url, part_path, state_path, priority,
+                              algorithm)
+
+    with response:
+        if response.status == 206 \
+                and not _range_matches(response, state, offset):
+            response.close()
+            _remove(part_path)
+            _remove(state_path)
+            return _download_part(url, part_path, state_path, priority,
+                                  algorithm)
+
+        if response.status != 206:
+            offset = 0
+            state = {
+                'url': url,
+                'etag': response.getheader('ETag'),
+                'last_modified': response.getheader('Last-Modified'),
+                'size': _content_length(response),
+            }
+
+            # segments arrive out of order and couldn't be hashed as they
+            # stream, so a file with a checksum to verify is fetched whole
+            if algorithm is None \
+                    and _segmentable(response, state['size']):
+                state['segments'] = _segments(state['size'])
+                with open(part_path, 'wb') as f:
+                    f.truncate(state['size'])
+                _write_state(state_path, state)
+                _download_segments(url, part_path, state_path, state,
+                                   priority, response)
+                return None
+
+            _write_state(state_path, state)
+
+        # only a resumed download has to read back what it already has
+        hasher = checksums.new(algorithm)
+        if offset > 0:
+            hasher = _read_back(part_path, algorithm)
+
+        with open(part_path, 'ab' if offset > 0 else 'wb') as f:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if hasher is not None:
+                    hasher.update(chunk)
+                f.write(chunk)
+
+    size = state.get('size')
+    if size is not None and os.path.getsize(part_path) < size:
+        raise http.client.IncompleteRead(b'', size - os.path.getsize(part_path))
+    return hasher
+
+
+def _download_segments(url, part_path, state_path, state, priority,
+                       response=None):
+    """Fetch the byte ranges in state['segments'] concurrently.
+
+    Each segment is written in place into the preallocated part file and
+    its progress is checkpointed in the state file, so an interrupted
+    download only re-fetches the bytes each segment was missing.
+    """
+    lock = threading.Lock()
+    unsaved = [0]
+
+    def on_written(i, length):
+        with lock:
+            state['segments'][i][2] += length
+            unsaved[0] += length
+            if unsaved[0] >= SEGMENT_CHECKPOINT:
+                unsaved[0] = 0
+                _write_state(state_path, state)
+
+    def fetch(i):
+        start, end, written = state['segments'][i]
+        offset = start + written
+        if offset > end:
+            return
+
+        if i == 0 and response is not None:
+            r = response
+        else:
+            headers = {'Range': f'bytes={offset}-{end}'}
+            headers.update(_if_range(state))
+            r = urlopen(url, headers=headers, priority=priority)
+            if r.status != 206 or not _range_matches(r, state, offset):
+                r.close()
+                _remove(part_path)
+                _remove(state_path)
+                raise urllib.error.URLError(f'{url} changed while downloading')
+
+        with r, open(part_path, 'r+b', buffering=0) as f:
+            f.seek(offset)
+            remaining = end + 1 - offset
+            while remaining > 0:
+                chunk = r.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise http.client.IncompleteRead(b'', remaining)
+                f.write(chunk)
+                remaining -= len(chunk)
+                on_written(i, len(chunk))
+
+    try:
+        with ThreadPoolExecutor(max_workers=_segment_workers()) as executor:
+            futures = [executor.submit(fetch, i)
+                       for i in range(len(state['segments']))]
+            for future in futures:
+                future.result()
+    finally:
+        if os.path.exists(part_path):
+            with lock:
+                _write_state(state_path, state)
+
+
+def _read_back(part_path, algorithm):
+    if algorithm is None:
+        return None
+    return checksums.file_hasher(part_path, algorithm)
+
+
+def _segmentable(response, size):
+    if size is None or size < SEGMENT_THRESHOLD:
+        return False
+    return response.getheader('Accept-Ranges', '').lower() == 'bytes'
+
+
+def _segment_workers():
+    # stay within the connections bulk transfers may hold, so segments
+    # never take the slots kept free for interactive requests
+    return max(min(SEGMENT_WORKERS, pool.bulk_per_host), 1)
+
+
+def _segments(size):
+    count = max(min(_segment_workers(), size // SEGMENT_MIN_SIZE), 1)
+    segment_size = -(-size // count)
+    return [
+        [start, min(start + segment_size, size) - 1, 0]
+        for start in range(0, size, segment_size)
+    ]
+
+
+def _if_range(state):
+    # If-Range makes the server send the whole file when it changed
+    validator = state.get('etag')
+    if validator is None or validator.startswith('W/'):
+        validator = state.get('last_modified')
+    if validator is None:
+        return {}
+    return {'If-Range': validator}
+
+
+def _range_matches(response, state, offset):
+    m = re.match(r'bytes (\d+)-(\d+)/(\d+|\*)',
+                 response.getheader('Content-Range', ''))
+    if m is None or int(m.group(1)) != offset:
+        return False
+
+    if m.group(3) != '*' and state.get('size') is not None \
+            and int(m.group(3)) != state['size']:
+        return False
+
+    etag = response.getheader('ETag')
+    if etag is not None and state.get('etag') is not None \
+            and etag != state['etag']:
+        return False
+
+    return True
+
+
+def _content_length(response):
+    length = response.getheader('Content-Length')
+    if length is None or not length.isdigit():
+        return None
+    return int(length)
+
+
+def _read_state(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(path, state):
+    with open(path, 'w') as f:
+        f.write(json.dumps(state))
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _open(url, data, headers, method, timeout, priority):
+    parts = urlsplit(url)
+    host = parts.hostname
+
+    connect_timeout = latency.connect_timeout(host)
+    read_timeout = timeout
+    if read_timeout is None:
+        read_timeout = latency.read_timeout(host)
+
+    throttle.acquire(host)
+    try:
+        return _open_throttled(url, parts, data, headers, method,
+                               connect_timeout, read_timeout, priority)
+    except BaseException:
+        throttle.release(host)
+        raise
+
+
+def _open_throttled(url, parts, data, headers, method, connect_timeout,
+                    read_timeout, priority):
+    host = parts.hostname
+
+    if _uses_proxy(parts):
+        r = urllib.request.Request(url, data=data, headers=headers,
+                                   method=method)
+        r = urllib.request.urlopen(r, context=ssl_context(),
+                                   timeout=read_timeout)
+        return Response(url, r, lambda reusable: throttle.release(host),
+                        priority)
+
+    port = parts.port
+    if port is None:
+        port = 443 if parts.scheme == 'https' else 80
+    key = (parts.scheme, host, port)
+
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+
+    while True:
+        connection, reused = pool.acquire(parts.scheme, host, port,
+                                          connect_timeout, priority)
+        try:
+            if connection.sock is None:
+                started = time.monotonic()
+                connection.connect()
+                latency.observe(host, connect=time.monotonic() - started)
+            connection.sock.settimeout(read_timeout)
+
+            started = time.monotonic()
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+            latency.observe(host, first_byte=time.monotonic() - started)
+        except STALE_CONNECTION_ERRORS as e:
+            pool.release(key, connection, False)
+            if reused:
+                continue
+            raise urllib.error.URLError(e)
+        except (OSError, http.client.HTTPException) as e:
+            pool.release(key, connection, False)
+            raise urllib.error.URLError(e)
+        except BaseException:
+            pool.release(key, connection, False)
+            raise
+
+        def release(reusable, connection=connection):
+            pool.release(key, connection, reusable)
+            throttle.release(host)
+
+        return Response(url, response, release, priority)
 
 
-def download(url, path):
-    with urllib.request.urlopen(
-            url,
-            context=ssl_context(),
-            timeout=5) as response, \
-            open(path, 'wb') as f:
-        shutil.copyfileobj(response, f)
+def _uses_proxy(parts):
+    proxies = urllib.request.getproxies()
+    if parts.scheme not in proxies:
+        return False
+    return not urllib.request.proxy_bypass(parts.hostname)
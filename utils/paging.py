@@ -0,0 +1,70 @@
+import threading
+
+
+class PageSizeTuner:
+    """Pick a search page size from how fast and how large pages have been.
+
+    The size aims for pages that take about target_time seconds and stay
+    under max_page_bytes, and moves towards that gradually so one slow
+    page doesn't collapse it. state can be persisted and passed back in
+    to start the next search from where this one ended.
+    """
+
+    def __init__(self, state=None, min_size=10, max_size=500, initial_size=50,
+                 target_time=3.0, max_page_bytes=8 * 1024 * 1024,
+                 alpha=0.5):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_time = target_time
+        self.max_page_bytes = max_page_bytes
+        self.alpha = alpha
+
+        self._lock = threading.Lock()
+
+        state = state or {}
+        self._size = self._clamp(state.get('size', initial_size))
+        self._item_time = state.get('item_time', None)
+        self._item_bytes = state.get('item_bytes', None)
+
+    @property
+    def size(self):
+        with self._lock:
+            return self._size
+
+    @property
+    def state(self):
+        with self._lock:
+            return {
+                'size': self._size,
+                'item_time': self._item_time,
+                'item_bytes': self._item_bytes,
+            }
+
+    def observe(self, elapsed, count, size):
+        """Record a page of count items that took elapsed seconds and was
+        size bytes long."""
+        if count == 0:
+            return
+
+        with self._lock:
+            self._item_time = self._average(self._item_time, elapsed / count)
+            self._item_bytes = self._average(self._item_bytes, size / count)
+
+            ideal = min(self.target_time / max(self._item_time, 1e-6),
+                        self.max_page_bytes / max(self._item_bytes, 1.0))
+            # grow at most twofold per page so a single fast page
+            # can't jump straight to a size the server chokes on
+            self._size = self._clamp(min(ideal, 2 * self._size))
+
+    def failed(self):
+        """Halve the page size after a page timed out or was cut off."""
+        with self._lock:
+            self._size = self._clamp(self._size // 2)
+
+    def _average(self, average, value):
+        if average is None:
+            return value
+        return self.alpha * value + (1 - self.alpha) * average
+
+    def _clamp(self, size):
+        return int(max(self.min_size, min(self.max_size, size)))
@@ -0,0 +1,267 @@
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# a tile is meant to hold about this many matches
+TILE_ITEMS = 500
+# shortest time window worth a query of its own, in seconds
+MIN_WINDOW = 24 * 60 * 60
+
+
+class SearchPlanner:
+    """Split a large search into sub-queries searched concurrently.
+
+    The first page of the whole search decides the plan. When it shows
+    few matches the search simply carries on. Otherwise the matches are
+    spread over cells of about tile_items each: the part of the time range
+    within the collections' temporal extent is cut into windows of equal
+    length, the first and last of which reach out to the ends of the
+    range, and each window's extent is cut into a grid of tiles when
+    there are more cells than windows. Items from each window are
+    streamed in chronological order, and items that appear in more than
+    one cell are dropped.
+    """
+
+    def __init__(self, max_tiles=16, workers=4, tile_items=TILE_ITEMS,
+                 min_window=MIN_WINDOW):
+        self.max_tiles = max_tiles
+        self.workers = workers
+        self.tile_items = tile_items
+        self.min_window = min_window
+
+    def search_pages(self, api, collections=[], bbox=[], start_time=None,
+                     end_time=None, query=None, on_next_page=None,
+                     tuner=None, max_items=None, max_bytes=None,
+                     on_truncated=None):
+        budget = {}
+        if max_items is not None:
+            budget['max_items'] = max_items
+        if max_bytes is not None:
+            budget['max_bytes'] = max_bytes
+
+        seen = set()
+        first_page = {}
+
+        def on_page(search_result, count, limit):
+            if len(first_page) == 0:
+                first_page['cells'] = self.cells(
+                    collections, bbox, start_time, end_time,
+                    self.tile_count(search_result, count, limit)
+                )
+
+        pages = api.search_pages(collections, bbox, start_time, end_time,
+                                 query, on_next_page=on_next_page,
+                                 tuner=tuner, on_page=on_page,
+                                 on_truncated=on_truncated, **budget)
+        try:
+            for batch in pages:
+                batch = self._unseen(api, batch, seen)
+                if len(batch) > 0:
+                    yield batch
+                if len(first_page.get('cells', [])) > 1:
+                    break
+            else:
+                return
+        finally:
+            pages.close()
+
+        cells = first_page['cells']
+        if 'max_bytes' in budget:
+            budget['max_bytes'] = max_bytes // len(cells)
+
+        total = len(seen)
+        for batch in self._search_cells(api, cells, collections, query,
+                                        on_next_page, tuner, budget,
+                                        on_truncated):
+            batch = self._unseen(api, batch, seen)
+            if max_items is not None:
+                batch = batch[:max(max_items - total, 0)]
+            if len(batch) > 0:
+                total += len(batch)
+                yield batch
+            if max_items is not None and total >= max_items:
+                # the other cells may still hold more
+                if on_truncated is not None:
+                    on_truncated(api)
+                return
+
+    def tile_count(self, search_result, count, limit):
+        matched = search_result.matched
+        if matched is None:
+            more = search_result.next_link is not None \
+                or search_result.next is not None \
+                or (limit is not None and count >= limit)
+            if not more:
+                return 1
+            # a full first page without a total: assume at least
+            # four tiles' worth
+            matched = 4 * self.tile_items
+
+        tiles = math.ceil(matched / self.tile_items)
+        return max(1, min(self.max_tiles, tiles))
+
+    def cells(self, collections, bbox, start_time, end_time, count):
+        """Plan count cells as (window, bbox, start, end) tuples."""
+        if count <= 1:
+            return [(0, bbox, start_time, end_time)]
+
+        windows = [(start_time, end_time)]
+        start, end = search_interval(collections, start_time, end_time)
+        if start is not None and end is not None:
+            # every window is expected to hold about the same number of
+            # matches as the clipped range is equally dense throughout
+            duration = (end - start).total_seconds()
+            window_count = min(count, int(duration // self.min_window))
+            if window_count > 1:
+                windows = split_interval(start, end, window_count)
+                # the extent only sizes the windows; whatever lies outside
+                # it is still searched
+                windows[0] = (start_time, windows[0][1])
+                windows[-1] = (windows[-1][0], end_time)
+
+        tiles = [bbox]
+        if len(bbox) == 4:
+            # never more cells than count in total
+            tiles = split_bbox(bbox, count // len(windows))
+
+        return [
+            (i, tile, window_start, window_end)
+            for i, (window_start, window_end) in enumerate(windows)
+            for tile in tiles
+        ]
+
+    def _search_cells(self, api, cells, collections, query, on_next_page,
+                      tuner, budget, on_truncated):
+        results = queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def search_cell(window, bbox, start_time, end_time):
+            try:
+                pages = api.search_pages(collections, bbox, start_time,
+                                         end_time, query,
+                                         on_next_page=on_next_page,
+                                         tuner=tuner,
+                                         on_truncated=on_truncated,
+                                         **budget)
+                for batch in pages:
+                    if stop.is_set():
+                        pages.close()
+                        break
+                    results.put((window, batch))
+            except Exception as e:
+                results.put((window, e))
+            finally:
+                results.put((window, done))
+
+        remaining = {}
+        for window, _, _, _ in cells:
+            remaining[window] = remaining.get(window, 0) + 1
+        buffered = {window: [] for window in remaining}
+        current = 0
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for cell in cells:
+                executor.submit(search_cell, *cell)
+
+            while current < len(remaining):
+                window, result = results.get()
+                if isinstance(result, Exception):
+                    raise result
+
+                if result is done:
+                    remaining[window] -= 1
+                elif window == current:
+                    yield result
+                else:
+                    # hold later windows back to keep the order
+                    buffered[window].append(result)
+
+                # flush every window that has completed in the meantime
+                while current < len(remaining) \
+                        and remaining[current] == 0:
+                    current += 1
+                    if current < len(remaining):
+                        for batch in buffered.pop(current):
+                            yield batch
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def _unseen(self, api, batch, seen):
+        unseen = []
+        for item in batch:
+            key = (api.id, item.collection_id, item.id)
+            if key in seen:
+                continue
+            seen.add(key)
+            unseen.append(item)
+        return unseen
+
+
+def search_interval(collections, start_time, end_time):
+    """Clip the searched time range to the collections' temporal extent."""
+    if start_time is None or end_time is None:
+        return None, None
+
+    starts = []
+    ends = []
+    for collection in collections:
+        start, end = collection.extent.temporal_interval
+        starts.append(start)
+        ends.append(end)
+
+    if len(starts) > 0 and None not in starts:
+        start_time = max(start_time, min(starts))
+    if len(ends) > 0 and None not in ends:
+        end_time = min(end_time, max(ends))
+
+    if start_time >= end_time:
+        return None, None
+    return start_time, end_time
+
+
+def split_interval(start, end, count):
+    step = (end - start) / count
+    return [
+        (start + step * i, end if i == count - 1 else start + step * (i + 1))
+        for i in range(count)
+    ]
+
+
+def split_bbox(bbox, tiles):
+    """Cut bbox into a grid of at most tiles cells, roughly square in
+    degrees."""
+    west, south, east, north = bbox
+    width = east - west
+    if width < 0:
+        # crosses the antimeridian
+        width += 360
+    height = north - south
+
+    if width <= 0 and height <= 0:
+        return [list(bbox)]
+
+    if height <= 0:
+        columns = tiles
+    else:
+        columns = round(math.sqrt(tiles * width / height))
+        columns = max(1, min(tiles, columns))
+    rows = max(1, tiles // columns)
+
+    return [
+        [
+            _longitude(west + width * column / columns),
+            south + height * row / rows,
+            _longitude(west + width * (column + 1) / columns),
+            south + height * (row + 1) / rows,
+        ]
+        for row in range(rows)
+        for column in range(columns)
+    ]
+
+
+def _longitude(value):
+    return value - 360 if value > 180 else value
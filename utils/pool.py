@@ -0,0 +1,136 @@
+import http.client
+import socket
+import threading
+import time
+
+from .scheduler import INTERACTIVE, BULK
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections shared by every thread, per host.
+
+    Connections are handed out by priority: a request waits while one of
+    a higher priority is waiting for the same host, and bulk transfers
+    never hold the last reserved connections of a host, so a thumbnail or
+    metadata request gets through while large downloads run. Bulk
+    transfers wait for a connection without a deadline, as the ones ahead
+    of them may legitimately take long.
+    """
+
+    def __init__(self, max_per_host=4, idle_timeout=30, acquire_timeout=60,
+                 reserved=1, context_factory=None):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.reserved = reserved
+        self._context_factory = context_factory
+
+        self._condition = threading.Condition()
+        self._idle = {}
+        self._active = {}
+        self._waiting = {}
+
+    @property
+    def bulk_per_host(self):
+        """How many connections per host bulk transfers may hold."""
+        return max(self.max_per_host - self.reserved, 1)
+
+    def acquire(self, scheme, host, port, timeout, priority=INTERACTIVE):
+        key = (scheme, host, port)
+        deadline = None
+        if priority != BULK:
+            deadline = time.monotonic() + self.acquire_timeout
+
+        with self._condition:
+            waiting = self._waiting.setdefault(key, {})
+            waiting[priority] = waiting.get(priority, 0) + 1
+            try:
+                while True:
+                    self._evict_idle()
+
+                    if self._available(key, priority):
+                        self._active[key] = self._active.get(key, 0) + 1
+                        idle = self._idle.get(key, [])
+                        if len(idle) == 0:
+                            break
+
+                        connection, _ = idle.pop()
+                        connection.timeout = timeout
+                        if connection.sock is not None:
+                            connection.sock.settimeout(timeout)
+                        return connection, True
+
+                    if deadline is None:
+                        self._condition.wait()
+                        continue
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise socket.timeout(f'timed out waiting for a connection to {host}')
+                    self._condition.wait(remaining)
+            finally:
+                waiting[priority] -= 1
+                # let lower priorities re-check once this one is served
+                self._condition.notify_all()
+
+        try:
+            return self._create(scheme, host, port, timeout), False
+        except Exception:
+            self.release(key, None, False)
+            raise
+
+    def release(self, key, connection, reusable):
+        with self._condition:
+            self._active[key] = max(self._active.get(key, 0) - 1, 0)
+
+            if connection is not None:
+                if reusable and connection.sock is not None:
+                    self._idle.setdefault(key, []).append(
+                        (connection, time.monotonic())
+                    )
+                else:
+                    connection.close()
+
+            self._evict_idle()
+            self._condition.notify_all()
+
+    def clear(self):
+        with self._condition:
+            for idle in self._idle.values():
+                for connection, _ in idle:
+                    connection.close()
+            self._idle = {}
+
+    def _available(self, key, priority):
+        waiting = self._waiting.get(key, {})
+        if any(waiting.get(p, 0) > 0 for p in range(priority)):
+            return False
+
+        limit = self.max_per_host
+        if priority == BULK:
+            limit = self.bulk_per_host
+        return self._active.get(key, 0) < limit
+
+    def _create(self, scheme, host, port, timeout):
+        if scheme == 'https':
+            context = None
+            if self._context_factory is not None:
+                context = self._context_factory()
+            return http.client.HTTPSConnection(host, port, timeout=timeout,
+                                               context=context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for key, idle in list(self._idle.items()):
+            fresh = []
+            for connection, released_at in idle:
+                if now - released_at > self.idle_timeout:
+                    connection.close()
+                else:
+                    fresh.append((connection, released_at))
+
+            if len(fresh) > 0:
+                self._idle[key] = fresh
+            else:
+                del self._idle[key]
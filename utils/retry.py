@@ -0,0 +1,150 @@
+import email.utils
+import http.client
+import random
+import socket
+import threading
+import time
+import urllib.error
+
+from . import metrics
+
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+RETRYABLE_ERRORS = (
+    urllib.error.URLError,
+    socket.timeout,
+    ConnectionError,
+    http.client.HTTPException,
+)
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter, honoring Retry-After."""
+
+    def __init__(self, attempts=4, backoff=0.5, max_backoff=30.0,
+                 statuses=RETRY_STATUSES):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def should_retry(self, error):
+        if isinstance(error, urllib.error.HTTPError):
+            return error.code in self.statuses
+        return isinstance(error, RETRYABLE_ERRORS)
+
+    def delay(self, attempt, error=None):
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+
+        cap = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return random.uniform(cap / 2, cap)
+
+    def backoff_for(self, attempt, error, host=None, deadline=None,
+                    latency=None):
+        """Return the delay before retrying after error, or None to give up.
+
+        attempt counts from 0 for the first failure.
+        """
+        if attempt + 1 >= self.attempts or not self.should_retry(error):
+            return None
+
+        delay = self.delay(attempt, error)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+
+        if latency is not None and _is_timeout(error):
+            latency.timed_out(host)
+
+        metrics.increment('http.retry')
+        metrics.increment(f'http.retry.{host}')
+        return delay
+
+    def call(self, fn, host=None, deadline=None, latency=None):
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                delay = self.backoff_for(attempt, e, host, deadline, latency)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+
+class LatencyTracker:
+    """Per-host moving averages used to size connect and read timeouts."""
+
+    def __init__(self, alpha=0.3, factor=4.0, connect_bounds=(2.0, 15.0),
+                 read_bounds=(5.0, 60.0)):
+        self.alpha = alpha
+        self.factor = factor
+        self.connect_bounds = connect_bounds
+        self.read_bounds = read_bounds
+
+        self._lock = threading.Lock()
+        self._connect = {}
+        self._read = {}
+
+    def observe(self, host, connect=None, first_byte=None):
+        with self._lock:
+            if connect is not None:
+                self._connect[host] = self._average(self._connect, host,
+                                                    connect)
+            if first_byte is not None:
+                self._read[host] = self._average(self._read, host, first_byte)
+
+    def timed_out(self, host):
+        # double the next read timeout instead of waiting for a success
+        # that may never come at the current one
+        with self._lock:
+            timeout = self._timeout(self._read, host, self.read_bounds)
+            self._read[host] = 2 * timeout / self.factor
+
+    def connect_timeout(self, host):
+        with self._lock:
+            return self._timeout(self._connect, host, self.connect_bounds)
+
+    def read_timeout(self, host):
+        with self._lock:
+            return self._timeout(self._read, host, self.read_bounds)
+
+    def _average(self, averages, host, value):
+        if host not in averages:
+            return value
+        return self.alpha * value + (1 - self.alpha) * averages[host]
+
+    def _timeout(self, averages, host, bounds):
+        minimum, maximum = bounds
+        if host not in averages:
+            return minimum
+        return max(minimum, min(maximum, self.factor * averages[host]))
+
+
+def _is_timeout(error):
+    if isinstance(error, urllib.error.URLError):
+        error = error.reason
+    return isinstance(error, socket.timeout)
+
+
+def _retry_after(error):
+    headers = getattr(error, 'headers', None)
+    if headers is None:
+        return None
+
+    value = headers.get('Retry-After', None)
+    if value is None:
+        return None
+
+    if value.strip().isdigit():
+        return float(value)
+
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return max(date.timestamp() - time.time(), 0.0)
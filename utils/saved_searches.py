@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from .search_cache import search_key
+from ..models.saved_search import SavedSearch
+
+
+class SavedSearchStore:
+    """Saved searches on disk, one JSON file per normalized search.
+
+    A search is identified by everything but its end time, so running it
+    again later finds the result set of the previous run. Searches not
+    saved for max_age seconds are forgotten.
+    """
+
+    def __init__(self, directory, max_searches=50, max_age=30 * 24 * 60 * 60):
+        self.directory = directory
+        self.max_searches = max_searches
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+
+    def get(self, api, collections, bbox, start_time, query):
+        path = self._path(api, collections, bbox, start_time, query)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                with self._lock:
+                    os.remove(path)
+                return None
+
+            with open(path, 'r') as f:
+                return SavedSearch(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, api, collections, bbox, start_time, query, saved_search):
+        path = self._path(api, collections, bbox, start_time, query)
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(saved_search.json, f)
+            os.replace(tmp_path, path)
+
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            for path in self._paths():
+                os.remove(path)
+
+    def _evict(self):
+        paths = sorted(self._paths(), key=os.path.getmtime, reverse=True)
+        for path in paths[self.max_searches:]:
+            os.remove(path)
+
+    def _paths(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [os.path.join(self.directory, filename)
+                for filename in os.listdir(self.directory)
+                if filename.endswith('.json')]
+
+    def _path(self, api, collections, bbox, start_time, query):
+        key = json.dumps([
+            search_key(api, collections, bbox, start_time, None),
+            query,
+        ], sort_keys=True)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.json')
+
+
+saved_searches = SavedSearchStore(os.path.join(
+    os.path.split(os.path.dirname(__file__))[0],
+    'cache',
+    'searches'
+))
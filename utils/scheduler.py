@@ -0,0 +1,71 @@
+import threading
+import time
+
+from .throttle import TokenBucket
+
+INTERACTIVE = 0
+THUMBNAIL = 1
+BULK = 2
+
+
+class BandwidthScheduler:
+    """Shares the link between transfers of different priorities.
+
+    A transfer pauses between reads while one of a higher priority is
+    running, up to max_pause seconds per read so it never stalls long
+    enough for the server to drop it. An optional limit caps the combined
+    throughput of every transfer in bytes per second.
+    """
+
+    def __init__(self, limit=None, max_pause=2.0):
+        self.max_pause = max_pause
+
+        self._condition = threading.Condition()
+        self._active = {INTERACTIVE: 0, THUMBNAIL: 0, BULK: 0}
+        self._bucket = None
+        self.set_limit(limit)
+
+    def set_limit(self, limit):
+        with self._condition:
+            self.limit = limit
+            self._bucket = None
+            if limit is not None:
+                # allow bursts of about a quarter of a second of traffic
+                self._bucket = TokenBucket(limit, max(limit / 4, 64 * 1024))
+
+    def begin(self, priority):
+        with self._condition:
+            self._active[priority] += 1
+
+    def end(self, priority):
+        with self._condition:
+            self._active[priority] -= 1
+            self._condition.notify_all()
+
+    def consume(self, priority, size):
+        deadline = time.monotonic() + self.max_pause
+        with self._condition:
+            while self._preempted(priority):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+        delay = self.reserve(size)
+        if delay > 0:
+            time.sleep(delay)
+
+    def reserve(self, size):
+        """Account for size bytes and return how long to wait for them."""
+        with self._condition:
+            bucket = self._bucket
+        if bucket is None or size <= 0:
+            return 0.0
+        return bucket.reserve(size)
+
+    def _preempted(self, priority):
+        return any(
+            count > 0
+            for p, count in self._active.items()
+            if p < priority
+        )
@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+BBOX_PRECISION = 4
+
+# query operators that can be checked against an item's properties
+COMPARISONS = {
+    'eq': lambda value, bound: value == bound,
+    'neq': lambda value, bound: value != bound,
+    'lt': lambda value, bound: value < bound,
+    'lte': lambda value, bound: value <= bound,
+    'gt': lambda value, bound: value > bound,
+    'gte': lambda value, bound: value >= bound,
+    'in': lambda value, bound: value in bound,
+}
+
+
+class SearchCache:
+    """Recent search results in memory, keyed by the normalized search.
+
+    A search is answered from the cache when the same search ran within
+    ttl seconds, or when a complete earlier result for the same API,
+    collections, extent and time differs only by a looser query; its items
+    are then filtered locally. At most max_items items are kept, evicting
+    the least recently used searches first.
+    """
+
+    def __init__(self, ttl=600, max_items=20000):
+        self.ttl = ttl
+        self.max_items = max_items
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, api, collections, bbox, start_time, end_time, query):
+        base = search_key(api, collections, bbox, start_time, end_time)
+        key = (base, _canonical(query))
+
+        with self._lock:
+            self._expire()
+
+            entry = self._entries.get(key, None)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return list(entry['items'])
+
+            for (entry_base, _), entry in reversed(self._entries.items()):
+                if entry_base != base or not entry['complete'] \
+                        or not refines(query, entry['query']) \
+                        or not _filterable(entry['items'], query):
+                    continue
+                return [item for item in entry['items']
+                        if matches(item.properties, query)]
+
+        return None
+
+    def put(self, api, collections, bbox, start_time, end_time, query, items,
+            complete=True):
+        base = search_key(api, collections, bbox, start_time, end_time)
+        key = (base, _canonical(query))
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous['items'])
+
+            if len(items) > self.max_items:
+                return
+
+            self._entries[key] = {
+                'query': query,
+                'items': list(items),
+                'complete': complete,
+                'stored': time.monotonic(),
+            }
+            self._size += len(items)
+
+            while self._size > self.max_items:
+                _, entry = self._entries.popitem(last=False)
+                self._size -= len(entry['items'])
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._size = 0
+
+    def _expire(self):
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if now - entry['stored'] > self.ttl:
+                del self._entries[key]
+                self._size -= len(entry['items'])
+
+
+def search_key(api, collections, bbox, start_time, end_time):
+    return _canonical({
+        'api': api.href,
+        'collections': sorted(c.id for c in collections),
+        'bbox': [round(float(v), BBOX_PRECISION) for v in bbox],
+        'time': [_time(start_time), _time(end_time)],
+    })
+
+
+def refines(query, cached_query):
+    """Whether every item matching query also matches cached_query."""
+    if cached_query is None:
+        return query is None or _checkable(query)
+    if query is None or not _checkable(query):
+        return False
+
+    for name, cached in cached_query.items():
+        constraint = query.get(name, None)
+        if constraint is None:
+            return False
+
+        try:
+            for op, bound in cached.items():
+                if op in ('gt', 'gte'):
+                    lower = _bound(constraint, 'gt', 'gte', max)
+                    if lower is None or lower[0] < bound \
+                            or (lower[0] == bound and op == 'gt'
+                                and not lower[1]):
+                        return False
+                elif op in ('lt', 'lte'):
+                    upper = _bound(constraint, 'lt', 'lte', min)
+                    if upper is None or upper[0] > bound \
+                            or (upper[0] == bound and op == 'lt'
+                                and not upper[1]):
+                        return False
+                elif constraint.get(op, None) != bound:
+                    return False
+        except TypeError:
+            return False
+
+    return True
+
+
+def matches(properties, query):
+    if query is None:
+        return True
+
+    for name, constraint in query.items():
+        value = properties.get(name, None)
+        if value is None:
+            return False
+        for op, bound in constraint.items():
+            try:
+                if not COMPARISONS[op](value, bound):
+                    return False
+            except TypeError:
+                return False
+    return True
+
+
+def _bound(constraint, strict_op, op, tightest):
+    """The tightest of a constraint's strict_op and op bounds as
+    (value, strict), or None."""
+    bounds = []
+    if op in constraint:
+        bounds.append((constraint[op], False))
+    if strict_op in constraint:
+        bounds.append((constraint[strict_op], True))
+    if len(bounds) == 0:
+        return None
+
+    value = tightest(value for value, _ in bounds)
+    # at the same value the strict bound is the tighter one
+    return value, any(strict for v, strict in bounds if v == value)
+
+
+def _filterable(items, query):
+    # projected items may lack the properties the query looks at
+    return all(name in item.properties
+               for item in items for name in query)
+
+
+def _checkable(query):
+    return all(
+        isinstance(constraint, dict)
+        and all(op in COMPARISONS for op in constraint)
+        for constraint in query.values()
+    )
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+def _time(value):
+    if value is None:
+        return None
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+search_cache = SearchCache()
@@ -0,0 +1,32 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Run at most one call per key; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Return (result, shared) where shared is True for followers."""
+        with self._lock:
+            call = self._calls.get(key, None)
+            leader = call is None
+            if leader:
+                call = Future()
+                self._calls[key] = call
+
+        if not leader:
+            return call.result(), True
+
+        try:
+            call.set_result(fn())
+        except BaseException as e:
+            call.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+        return call.result(), False
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from . import metrics
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def reserve(self, tokens=1):
+        """Take tokens and return how long to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= tokens
+
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class Throttle:
+    """Process-wide request rate and in-flight limits, per host."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._buckets = {}
+        self._max_in_flight = {}
+        self._in_flight = {}
+
+    def configure(self, host, requests_per_second=None, burst=None,
+                  max_in_flight=None):
+        with self._condition:
+            if requests_per_second is None:
+                self._buckets.pop(host, None)
+            else:
+                self._buckets[host] = TokenBucket(requests_per_second, burst)
+
+            if max_in_flight is None:
+                self._max_in_flight.pop(host, None)
+            else:
+                self._max_in_flight[host] = max_in_flight
+            self._condition.notify_all()
+
+    def acquire(self, host):
+        started = time.monotonic()
+
+        with self._condition:
+            while self._in_flight.get(host, 0) \
+                    >= self._max_in_flight.get(host, float('inf')):
+                self._condition.wait()
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+            bucket = self._buckets.get(host, None)
+
+        if bucket is not None:
+            delay = bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+        waited = time.monotonic() - started
+        metrics.observe('http.queue_delay', waited)
+        metrics.observe(f'http.queue_delay.{host}', waited)
+
+    def release(self, host):
+        with self._condition:
+            self._in_flight[host] = max(self._in_flight.get(host, 0) - 1, 0)
+            self._condition.notify_all()